@@ -0,0 +1,245 @@
+import sys
+from array import array
+from argparse import ArgumentParser
+
+from determinant import no_inverse
+from general import error, write_batch_rows, write_lines, wrong_input
+from matrix import Matrix, numpy
+from parallel import parallel_determinant, parallel_inverse, \
+    parallel_multiply
+from sparse import SparseMatrix, compact
+
+
+operations = {
+    "add": 2,
+    "scale": 1,
+    "multiply": 2,
+    "transpose": 1,
+    "determinant": 1,
+    "inverse": 1,
+}
+transpositions = {
+    "main": "transpose_main",
+    "side": "transpose_side",
+    "vertical": "transpose_vertical",
+    "horizontal": "transpose_horizontal",
+}
+npy_suffix = ".npy"
+empty_input = "No matrix elements in {}"
+stdio = "-"
+
+
+def get_args(argv=None):
+    parser = ArgumentParser(description="""Performs one matrix
+    operation on matrices read from files, without any prompts.
+    Text files hold one row per line, numbers separated by whitespace.""")
+    parser.add_argument("operation",
+                        choices=operations,
+                        help="operation to perform")
+    parser.add_argument("inputs",
+                        nargs="+",
+                        help="text or .npy matrix files, '-' for "
+                             "standard input")
+    parser.add_argument("-o", "--output",
+                        default=stdio,
+                        help="text or .npy file to write the result to, "
+                             "standard output by default")
+    parser.add_argument("-k", "--constant",
+                        type=float,
+                        default=1.0,
+                        help="constant for scale")
+    parser.add_argument("--kind",
+                        choices=transpositions,
+                        default="main",
+                        help="kind of transposition")
+    parser.add_argument("-j", "--jobs",
+                        type=int,
+                        default=1,
+                        help="worker processes for multiply, determinant "
+                             "and inverse of dense matrices, 0 for one "
+                             "per CPU")
+    parser.add_argument("--sparse",
+                        action="store_true",
+                        help="keep inputs with at most 5%% non-zero "
+                             "elements in sparse form")
+    parser.add_argument("--raw",
+                        action="store_true",
+                        help="write result matrix as raw binary: rows and "
+                             "columns as two 64-bit integers, then "
+                             "elements as doubles row by row, native "
+                             "byte order")
+    parser.add_argument("--exact",
+                        action="store_true",
+                        help="exact integer arithmetic for determinant "
+                             "and inverse, input must be integer")
+    args = parser.parse_args(argv)
+
+    if len(args.inputs) != operations[args.operation]:
+        parser.error("{} takes {} input matrices".format(
+            args.operation, operations[args.operation]))
+
+    return args
+
+
+def read_matrix(path):
+    """Read matrix from text or .npy file, it must not be empty"""
+
+    if path.endswith(npy_suffix):
+        matrix = read_npy_matrix(path)
+    elif path == stdio:
+        matrix = read_text_matrix(sys.stdin)
+    else:
+        with open(path) as file:
+            matrix = read_text_matrix(file)
+
+    if matrix.rows == 0 or matrix.cols == 0:
+        raise ValueError(empty_input.format(
+            "standard input" if path == stdio else path))
+
+    return matrix
+
+
+def read_text_matrix(file):
+    """Read whitespace separated rows, streaming them into one array"""
+
+    data = array("d")
+    rows = 0
+    cols = None
+
+    for line in file:
+        values = line.split()
+        if not values:
+            continue
+
+        if cols is None:
+            cols = len(values)
+        elif len(values) != cols:
+            raise ValueError(wrong_input.format(cols))
+
+        data.extend(map(float, values))
+        rows += 1
+
+    return Matrix(rows, cols or 0, data)
+
+
+def read_npy_matrix(path):
+    """Map 2D .npy array, its data is read only on access"""
+
+    if numpy is None:
+        raise ValueError("NumPy is required for .npy files")
+
+    loaded = numpy.load(path, mmap_mode="r")
+    if loaded.ndim != 2:
+        raise ValueError("2D array expected in {}".format(path))
+
+    rows, cols = loaded.shape
+    data = numpy.ascontiguousarray(loaded, dtype=numpy.float64).reshape(-1)
+
+    return Matrix(rows, cols, data)
+
+
+def write_matrix(matrix, path, raw=False):
+    """Write matrix to text, raw binary or .npy file"""
+
+    if raw:
+        if path == stdio:
+            sys.stdout.flush()
+            write_raw_matrix(matrix, sys.stdout.buffer)
+        else:
+            with open(path, "wb") as file:
+                write_raw_matrix(matrix, file)
+        return
+
+    if path.endswith(npy_suffix):
+        if numpy is None:
+            raise ValueError("NumPy is required for .npy files")
+        numpy.save(path, matrix.as_numpy())
+        return
+
+    if path == stdio:
+        write_text_matrix(matrix, sys.stdout)
+        return
+
+    with open(path, "w") as file:
+        write_text_matrix(matrix, file)
+
+
+def write_text_matrix(matrix, file):
+    """Write rows of full precision numbers"""
+
+    write_lines((" ".join(map(repr, row.tolist())) for row in matrix), file)
+
+
+def write_raw_matrix(matrix, file):
+    """Write shape and elements as bytes, batches of rows at once"""
+
+    file.write(array("q", matrix.shape).tobytes())
+    rows = iter(matrix)
+    batch = [row.tobytes() for _, row in zip(range(write_batch_rows), rows)]
+    while batch:
+        file.write(b"".join(batch))
+        batch = [row.tobytes()
+                 for _, row in zip(range(write_batch_rows), rows)]
+
+
+def perform(args, matrices):
+    """Result of the requested operation, Matrix or number"""
+
+    workers = args.jobs or None
+    parallel = args.jobs != 1 and not args.exact \
+        and all(isinstance(matrix, Matrix) for matrix in matrices)
+
+    if args.operation == "add":
+        return matrices[0].add(matrices[1])
+
+    if args.operation == "scale":
+        return matrices[0].scale(args.constant)
+
+    if args.operation == "multiply":
+        if parallel:
+            return parallel_multiply(matrices[0], matrices[1], workers)
+        return matrices[0].multiply(matrices[1])
+
+    if args.operation == "transpose":
+        return getattr(matrices[0], transpositions[args.kind])()
+
+    if not matrices[0].is_square():
+        raise ValueError(error)
+
+    if args.operation == "determinant":
+        if parallel:
+            return parallel_determinant(matrices[0], workers)
+        return matrices[0].determinant(exact=args.exact)
+
+    inverse = parallel_inverse(matrices[0], workers=workers) if parallel \
+        else matrices[0].inverse(exact=args.exact)
+    if inverse is None:
+        raise ValueError(no_inverse)
+
+    return inverse
+
+
+def main(argv=None):
+    args = get_args(argv)
+
+    try:
+        matrices = [read_matrix(path) for path in args.inputs]
+        if args.sparse:
+            matrices = [compact(matrix) for matrix in matrices]
+        result = perform(args, matrices)
+
+        if isinstance(result, (Matrix, SparseMatrix)):
+            write_matrix(result, args.output, args.raw)
+        elif args.output == stdio:
+            print(result)
+        else:
+            with open(args.output, "w") as file:
+                print(result, file=file)
+    except (OSError, ValueError) as e:
+        # unreadable inputs and unwritable output included
+        print(e, file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+import os
+import random
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from timeit import Timer
+
+from decomposition import bareiss_determinant, gauss_jordan_inverse, \
+    rational_inverse
+from determinant import calc_determinant, calc_determinant_cofactor, \
+    print_inverse_matrix
+from general import print_matrix, print_matrix_cellwise, process_matrix
+from matrix import Matrix, gauss_jordan_inverse_numpy, \
+    multiply_transposed, numpy
+from parallel import parallel_inverse, parallel_multiply
+from simple import compute_mult_cell
+
+
+sizes = [5, 6, 8, 10, 50, 100, 200, 500]
+repeat = 3
+# cofactor expansion is O(n!), larger sizes never finish
+cofactor_max_size = 8
+cofactor_inverse_max_size = 6
+# numbers of exact inverse grow with size, O(n^4) bit operations
+rational_inverse_max_size = 100
+# column rebuilt for every cell, O(n^3) list allocations
+cell_multiply_max_size = 200
+# worker counts to show parallel scaling with, 2 even on a single CPU
+worker_counts = [1 << p for p in range(max(2, os.cpu_count()).bit_length())
+                 if 1 << p <= max(2, os.cpu_count())]
+row_pattern = "{:<24}{:>8}{:>14}"
+
+
+def random_matrix(rows, cols):
+    """Matrix of random floats in [-10, 10)"""
+
+    return [[random.uniform(-10, 10) for _ in range(cols)]
+            for _ in range(rows)]
+
+
+def random_integer_matrix(rows, cols):
+    """Matrix of random integers in [-10, 10]"""
+
+    return [[random.randint(-10, 10) for _ in range(cols)]
+            for _ in range(rows)]
+
+
+def measure(action):
+    """Best time of one call in milliseconds"""
+
+    timer = Timer(action)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number * 1e3
+
+
+def determinant_cases(size):
+    """Determinant implementations to time for given size"""
+
+    matrix = random_matrix(size, size)
+    yield "determinant_lu", lambda: calc_determinant(matrix)
+
+    if numpy is not None:
+        array = numpy.array(matrix)
+        yield "determinant_numpy", lambda: numpy.linalg.det(array)
+
+    integer_matrix = random_integer_matrix(size, size)
+    yield "determinant_bareiss", \
+        lambda: bareiss_determinant(integer_matrix)
+
+    if size <= cofactor_max_size:
+        yield "determinant_cofactor", \
+            lambda: calc_determinant_cofactor(matrix)
+
+
+def inverse_cases(size):
+    """Inverse implementations to time for given size"""
+
+    matrix = random_matrix(size, size)
+    yield "inverse_gauss_jordan", lambda: gauss_jordan_inverse(matrix)
+
+    if numpy is not None:
+        array = numpy.array(matrix)
+        yield "inverse_numpy", lambda: gauss_jordan_inverse_numpy(array)
+
+    if size <= rational_inverse_max_size:
+        integer_matrix = random_integer_matrix(size, size)
+        yield "inverse_rational", lambda: rational_inverse(integer_matrix)
+
+    if size <= cofactor_inverse_max_size:
+        det = calc_determinant(matrix)
+        yield "inverse_cofactor", lambda: quiet(
+            print_inverse_matrix, Matrix.from_rows(matrix), det)
+
+
+def quiet(action, *args):
+    """Call action with standard output discarded"""
+
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        action(*args)
+
+
+def multiply_cases(size):
+    """Multiplication implementations to time for given size"""
+
+    matrix1 = random_matrix(size, size)
+    matrix2 = random_matrix(size, size)
+    yield "multiply_transposed", \
+        lambda: multiply_transposed(matrix1, matrix2)
+
+    if numpy is not None:
+        yield "multiply_numpy", \
+            lambda: numpy.matmul(matrix1, matrix2).tolist()
+
+    if size <= cell_multiply_max_size:
+        yield "multiply_cells", lambda: process_matrix(
+            size,
+            size,
+            lambda i, j: compute_mult_cell(i, j, matrix1, matrix2)
+        )
+
+
+def print_cases(size):
+    """Matrix output implementations to time for given size"""
+
+    matrix = Matrix.from_rows(random_matrix(size, size))
+    yield "print_rows", lambda: quiet(print_matrix, matrix)
+    yield "print_cellwise", lambda: quiet(print_matrix_cellwise, matrix)
+
+
+def parallel_cases(size):
+    """Process pool implementations for every worker count"""
+
+    matrix1 = Matrix.from_rows(random_matrix(size, size))
+    matrix2 = Matrix.from_rows(random_matrix(size, size))
+    for workers in worker_counts:
+        yield "multiply_parallel_{}".format(workers), \
+            lambda workers=workers: parallel_multiply(matrix1, matrix2,
+                                                      workers)
+
+    for workers in worker_counts:
+        yield "inverse_parallel_{}".format(workers), \
+            lambda workers=workers: parallel_inverse(matrix1,
+                                                     workers=workers)
+
+
+benchmarks = {
+    "determinant": determinant_cases,
+    "inverse": inverse_cases,
+    "multiply": multiply_cases,
+    "print": print_cases,
+    "parallel": parallel_cases,
+}
+
+
+def main():
+    parser = ArgumentParser(description="""Times matrix operations
+    on random square matrices of growing size.""")
+    parser.add_argument("--max-size",
+                        type=int,
+                        default=max(sizes),
+                        help="largest matrix size to run")
+    parser.add_argument("--filter",
+                        default="",
+                        help="run only benchmarks with names containing it")
+    args = parser.parse_args()
+
+    print(row_pattern.format("case", "size", "time, ms"))
+    for name, cases in benchmarks.items():
+        if args.filter not in name:
+            continue
+
+        for size in sizes:
+            if size > args.max_size:
+                break
+
+            for case, action in cases(size):
+                print(row_pattern.format(case, size,
+                                         "{:.3f}".format(measure(action))))
+
+
+if __name__ == '__main__':
+    main()
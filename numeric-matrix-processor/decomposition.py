@@ -0,0 +1,178 @@
+from fractions import Fraction
+
+
+# integers up to it are all exactly representable as floats
+exact_float_limit = 2 ** 53
+# pivot relative to the largest element below which matrix is singular
+singular_tolerance = 1e-12
+
+
+def lu_decompose(matrix):
+    """LU decomposition with partial pivoting, returns (lu, perm, sign)
+
+    L (unit diagonal, below it) and U (diagonal and above) are stored
+    together in the rows of lu, perm lists the source row of every row,
+    sign is the parity of that permutation. Columns without non-zero
+    pivot are left as they are, making U singular.
+    """
+
+    size = len(matrix)
+    lu = [list(row) for row in matrix]
+    perm = list(range(size))
+    sign = 1
+
+    for k in range(size):
+        pivot_idx = max(range(k, size), key=lambda i: abs(lu[i][k]))
+        if lu[pivot_idx][k] == 0:
+            continue
+
+        if pivot_idx != k:
+            lu[k], lu[pivot_idx] = lu[pivot_idx], lu[k]
+            perm[k], perm[pivot_idx] = perm[pivot_idx], perm[k]
+            sign = -sign
+
+        pivot_row = lu[k]
+        pivot = pivot_row[k]
+        pivot_tail = pivot_row[k + 1:]
+        for i in range(k + 1, size):
+            row = lu[i]
+            factor = row[k] / pivot
+            row[k] = factor
+            if factor != 0:
+                row[k + 1:] = [a - factor * b
+                               for a, b in zip(row[k + 1:], pivot_tail)]
+
+    return lu, perm, sign
+
+
+def lu_determinant(matrix):
+    """Determinant as the product of U diagonal, O(n^3)"""
+
+    lu, _, det = lu_decompose(matrix)
+
+    for i in range(len(lu)):
+        det *= lu[i][i]
+
+    return round_if_integer((cell for row in matrix for cell in row), det)
+
+
+def round_if_integer(cells, det):
+    """Determinant of integer cells is integer, drop elimination round-off"""
+
+    # larger floats, infinities included, have no fraction to drop
+    if abs(det) < exact_float_limit and is_integer_cells(cells):
+        return float(round(det))
+
+    return det
+
+
+def is_integer_cells(cells):
+    return all(float(cell).is_integer() for cell in cells)
+
+
+def bareiss_determinant(matrix):
+    """Exact determinant of integer matrix by fraction-free elimination
+
+    Bareiss elimination keeps every cell an integer minor of the matrix,
+    each step divides exactly by the previous pivot, so numbers grow
+    only linearly and no round-off appears. O(n^3) operations.
+    """
+
+    rows = [[int(cell) for cell in row] for row in matrix]
+    size = len(rows)
+    sign = 1
+    previous = 1
+
+    for k in range(size - 1):
+        pivot_idx = next((i for i in range(k, size) if rows[i][k] != 0),
+                         None)
+        if pivot_idx is None:
+            return 0
+
+        if pivot_idx != k:
+            rows[k], rows[pivot_idx] = rows[pivot_idx], rows[k]
+            sign = -sign
+
+        pivot_row = rows[k]
+        pivot = pivot_row[k]
+        pivot_tail = pivot_row[k + 1:]
+        for i in range(k + 1, size):
+            row = rows[i]
+            factor = row[k]
+            row[k + 1:] = [(pivot * a - factor * b) // previous
+                           for a, b in zip(row[k + 1:], pivot_tail)]
+        previous = pivot
+
+    return sign * rows[-1][-1] if size else 1
+
+
+def rational_inverse(matrix):
+    """Exact inverse of integer matrix as rows of Fractions,
+    None for singular matrix
+
+    Gauss-Jordan elimination is done fraction-free on [matrix | I],
+    as in bareiss_determinant, which leaves det * I on the left and
+    det times the inverse on the right. Only the final cells become
+    Fractions, avoiding a gcd on every elimination step.
+    """
+
+    size = len(matrix)
+    rows = [[int(cell) for cell in row] + [int(i == j) for j in range(size)]
+            for i, row in enumerate(matrix)]
+    previous = 1
+
+    for k in range(size):
+        pivot_idx = next((i for i in range(k, size) if rows[i][k] != 0),
+                         None)
+        if pivot_idx is None:
+            return None
+
+        rows[k], rows[pivot_idx] = rows[pivot_idx], rows[k]
+        pivot_row = rows[k]
+        pivot = pivot_row[k]
+        pivot_tail = pivot_row[k:]
+        for i in range(size):
+            if i != k:
+                row = rows[i]
+                factor = row[k]
+                row[k:] = [(pivot * a - factor * b) // previous
+                           for a, b in zip(row[k:], pivot_tail)]
+        previous = pivot
+
+    return [[Fraction(cell, previous) for cell in row[size:]]
+            for row in rows]
+
+
+def gauss_jordan_inverse(matrix, tolerance=singular_tolerance):
+    """Inverse by Gauss-Jordan elimination, None for singular matrix
+
+    Matrix is taken as singular when a pivot is not larger than
+    tolerance times the largest absolute element.
+    """
+
+    size = len(matrix)
+    scale = max(abs(cell) for row in matrix for cell in row)
+    limit = scale * tolerance
+
+    rows = [list(row) + [float(i == j) for j in range(size)]
+            for i, row in enumerate(matrix)]
+
+    for k in range(size):
+        pivot_idx = max(range(k, size), key=lambda i: abs(rows[i][k]))
+        if abs(rows[pivot_idx][k]) <= limit:
+            return None
+
+        rows[k], rows[pivot_idx] = rows[pivot_idx], rows[k]
+        pivot_row = rows[k]
+        pivot = pivot_row[k]
+        # pivot row is zero left of the pivot, so is its elimination
+        pivot_tail = [cell / pivot for cell in pivot_row[k:]]
+        pivot_row[k:] = pivot_tail
+
+        for i in range(size):
+            row = rows[i]
+            factor = row[k]
+            if i != k and factor != 0:
+                row[k:] = [a - factor * b for a, b in zip(row[k:], pivot_tail)]
+
+    return [row[size:] for row in rows]
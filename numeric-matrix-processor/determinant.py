@@ -1,6 +1,8 @@
-from general import enter_size, enter_matrix, error, build_matrix, result_is
+from decomposition import exact_float_limit, lu_determinant
+from general import enter_size, enter_matrix, error, build_matrix, \
+    print_matrix, result_is
+from matrix import Matrix
 from simple import print_scale_matrix
-from transpose import transpose_main
 
 
 no_inverse = "This matrix doesn't have an inverse."
@@ -15,15 +17,17 @@ def do_calc_determinant():
     )
 
     if is_square_matrix(matrix):
-        det = calc_determinant(matrix)
+        # integer input gets exact result, printed as float like before
+        # while a float holds it exactly
+        det = matrix.determinant(exact=matrix.is_integer())
         print(result_is)
-        print(det)
+        print(float(det) if abs(det) < exact_float_limit else det)
 
 
 def is_square_matrix(matrix):
     """Check if matrix is square, print error text in other case"""
 
-    is_square = len(matrix) == len(matrix[0])
+    is_square = matrix.is_square()
 
     if not is_square:
         print(error)
@@ -40,17 +44,26 @@ def do_inverse_matrix():
     )
 
     if is_square_matrix(matrix):
-        det = calc_determinant(matrix)
+        inverse = matrix.inverse(exact=matrix.is_integer())
 
-        if det == 0:
+        if inverse is None:
             print(no_inverse)
             return
 
-        print_inverse_matrix(matrix, det)
+        print_matrix(inverse)
 
 
 def calc_determinant(matrix):
-    """Recursive determinant calculation"""
+    """Determinant calculation through LU decomposition"""
+
+    if len(matrix) == 1:
+        return matrix[0][0]
+
+    return lu_determinant(matrix)
+
+
+def calc_determinant_cofactor(matrix):
+    """Recursive determinant calculation, O(n!), reference only"""
 
     first_row = matrix[0]
 
@@ -62,37 +75,40 @@ def calc_determinant(matrix):
     for j in range(len(first_row)):
         cell = first_row[j]
         if cell != 0:
-            det += cell * calc_cofactor(0, j, matrix)
+            minor = get_minor(0, j, matrix)
+            det += cell * (-1) ** j * calc_determinant_cofactor(minor)
 
     return det
 
 
 def print_inverse_matrix(matrix, determinant):
-    """Calculate inverse matrix with given determinant"""
+    """Calculate inverse matrix through cofactors, reference only"""
 
-    new_matrix = []
-    size = len(matrix[0])
+    rows = matrix.to_rows()
+    size = matrix.rows
+    cofactors = Matrix(size, size)
 
     for i in range(size):
-
-        row = []
         for j in range(size):
-            cofactor = calc_cofactor(i, j, matrix)
-            row.append(cofactor)
-
-        new_matrix.append(row)
+            cofactors[i, j] = calc_cofactor(i, j, rows)
 
-    new_matrix = transpose_main(new_matrix)
-    print_scale_matrix(new_matrix, 1 / determinant)
+    print_scale_matrix(cofactors.transpose_main(), 1 / determinant)
 
 
 def calc_cofactor(i, j, matrix):
     """(I,J) cofactor calculation"""
 
+    k = (-1) ** (2 + i + j)
+
+    return k * calc_determinant(get_minor(i, j, matrix))
+
+
+def get_minor(i, j, matrix):
+    """Matrix without I row and J column"""
+
     lesser_matrix = []
     row_len = len(matrix[0])
     right_border = j + 1
-    k = (-1) ** (2 + i + j)
 
     for row_idx in range(0, row_len):
 
@@ -103,7 +119,7 @@ def calc_cofactor(i, j, matrix):
         new_row = get_row_part(old_row, row_len, j, right_border)
         lesser_matrix.append(new_row)
 
-    return k * calc_determinant(lesser_matrix)
+    return lesser_matrix
 
 
 def get_row_part(row, row_len, left_border, right_border):
@@ -1,3 +1,9 @@
+import sys
+from itertools import islice
+
+from matrix import Matrix
+
+
 your_choice = "Your choice: "
 error = "The operation cannot be performed."
 wrong_input = "Wrong input! {} space separated numbers expected"
@@ -6,6 +12,8 @@ enter_size = "Enter size of {}matrix: "
 enter_matrix = "Enter {}matrix:"
 result_is = "The result is:"
 max_decimals = 3
+# rows formatted into one write call
+write_batch_rows = 256
 
 
 def process_matrix(row_count, column_count, operator):
@@ -21,8 +29,44 @@ def process_matrix(row_count, column_count, operator):
     return result
 
 
-def print_matrix(matrix):
-    """Print given matrix row-by-row"""
+def print_matrix(matrix, file=None):
+    """Print given matrix, batches of formatted rows at once"""
+
+    file = file or sys.stdout
+    print(result_is, file=file)
+    write_lines(format_rows(matrix), file)
+
+
+def format_rows(matrix):
+    """Rows with cells of fixed decimals and common width
+
+    Longest integer part belongs to the largest or the smallest
+    element, so only these two are measured. Every row is formatted
+    by a single pattern.
+    """
+
+    extremes = max(matrix.cells()), min(matrix.cells())
+    max_len = max(len(str(round(n))) for n in extremes)
+    cell_pattern = "{{:{pos}.{part}f}}"\
+        .format(pos=max_len + max_decimals + 2, part=max_decimals)
+    row_pattern = " ".join([cell_pattern] * matrix.cols)
+
+    return (row_pattern.format(*row) for row in matrix)
+
+
+def write_lines(lines, file):
+    """Write lines in batches, one write call per batch"""
+
+    lines = iter(lines)
+    batch = list(islice(lines, write_batch_rows))
+    while batch:
+        file.write("\n".join(batch))
+        file.write("\n")
+        batch = list(islice(lines, write_batch_rows))
+
+
+def print_matrix_cellwise(matrix):
+    """Print given matrix row-by-row, reference only"""
 
     print(result_is)
     max_len = max((len(str(round(n))) for row in matrix for n in row))
@@ -34,7 +78,7 @@ def print_matrix(matrix):
 
 
 def build_matrix(prompt_size, prompt_matrix):
-    """Ask for size and elements, return 2D array"""
+    """Ask for size and elements, return Matrix"""
 
     rows, cols = [int(i) for i in get_num_row(
         2,
@@ -48,7 +92,7 @@ def build_matrix(prompt_size, prompt_matrix):
         row = get_num_row(cols, lambda x: float(x))
         matrix.append(row)
 
-    return matrix
+    return Matrix.from_rows(matrix)
 
 
 def get_num_row(size, element_processor, prompt=""):
@@ -0,0 +1,304 @@
+from array import array
+from itertools import chain, islice, repeat
+from operator import add, mul
+
+from decomposition import bareiss_determinant, gauss_jordan_inverse, \
+    is_integer_cells, lu_determinant, rational_inverse, round_if_integer, \
+    singular_tolerance
+
+try:
+    import numpy
+except ImportError:  # optional, speeds up products, inverse, determinant
+    numpy = None
+
+
+item_size = array("d").itemsize
+
+
+class Matrix:
+    """Matrix of floats stored in a flat array of doubles
+
+    Element (i, j) is data[offset + i * strides[0] + j * strides[1]],
+    so a matrix can be laid over the data of another one. Transpositions
+    are such views sharing the data, they cost O(1), copy() detaches them.
+    """
+
+    __slots__ = ("rows", "cols", "data", "offset", "strides")
+
+    def __init__(self, rows, cols, data=None, offset=0, strides=None):
+        self.rows = rows
+        self.cols = cols
+        self.data = array("d", bytes(item_size * rows * cols)) \
+            if data is None else data
+        self.offset = offset
+        self.strides = (cols, 1) if strides is None else strides
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Matrix with copy of given rows"""
+
+        data = array("d")
+        cols = len(rows[0]) if rows else 0
+        for row in rows:
+            if len(row) != cols:
+                raise ValueError("rows of different length")
+            data.extend(row)
+
+        return cls(len(rows), cols, data)
+
+    @classmethod
+    def from_numpy(cls, ndarray):
+        """Matrix with copy of given 2D NumPy array"""
+
+        data = array("d")
+        data.frombytes(numpy.ascontiguousarray(ndarray,
+                                               dtype=numpy.float64).tobytes())
+
+        return cls(*ndarray.shape, data)
+
+    @property
+    def shape(self):
+        return self.rows, self.cols
+
+    def is_square(self):
+        return self.rows == self.cols
+
+    def is_integer(self):
+        """Check that all elements are integers"""
+
+        return is_integer_cells(self.cells())
+
+    def is_contiguous(self):
+        """Check that elements are stored row by row without gaps"""
+
+        return self.strides == (self.cols, 1)
+
+    def __getitem__(self, cell):
+        i, j = cell
+        return self.data[self.offset + i * self.strides[0]
+                         + j * self.strides[1]]
+
+    def __setitem__(self, cell, value):
+        i, j = cell
+        self.data[self.offset + i * self.strides[0]
+                  + j * self.strides[1]] = value
+
+    def row(self, i):
+        """Copy of I row as an array"""
+
+        start = self.offset + i * self.strides[0]
+        step = self.strides[1]
+        if step > 0:
+            return self.data[start:start + step * self.cols:step]
+
+        last = start + step * (self.cols - 1)
+        return self.data[last:start + 1:-step][::-1]
+
+    def __iter__(self):
+        return (self.row(i) for i in range(self.rows))
+
+    def to_rows(self):
+        """Elements as list of lists"""
+
+        return [row.tolist() for row in self]
+
+    def cells(self):
+        """Iterate elements row by row without copying the matrix"""
+
+        if self.is_contiguous():
+            return islice(self.data, self.offset,
+                          self.offset + self.rows * self.cols)
+
+        return chain.from_iterable(self)
+
+    def flat(self):
+        """Elements row by row, the data itself when it's laid so"""
+
+        size = self.rows * self.cols
+        if self.is_contiguous():
+            if self.offset == 0 and len(self.data) == size:
+                return self.data
+            return self.data[self.offset:self.offset + size]
+
+        return array("d", self.cells())
+
+    def copy(self):
+        """Matrix with own contiguous copy of the elements"""
+
+        data = self.flat()
+        if data is self.data:
+            data = array("d", data)
+
+        return Matrix(self.rows, self.cols, data)
+
+    def as_numpy(self):
+        """NumPy array over the same data"""
+
+        return numpy.ndarray(
+            self.shape,
+            dtype=numpy.float64,
+            buffer=self.data,
+            offset=self.offset * item_size,
+            strides=(self.strides[0] * item_size,
+                     self.strides[1] * item_size)
+        )
+
+    def add(self, other):
+        """Element-wise sum with the same shape matrix"""
+
+        if self.shape != other.shape:
+            raise ValueError("shapes differ")
+
+        if not isinstance(other, Matrix):
+            # sparse operand adds its non-zeros to a copy of this one
+            return other.add(self)
+
+        return Matrix(self.rows, self.cols,
+                      array("d", map(add, self.cells(), other.cells())))
+
+    def scale(self, k):
+        """Matrix multiplied by a constant"""
+
+        return Matrix(self.rows, self.cols,
+                      array("d", map(mul, self.cells(), repeat(k))))
+
+    def multiply(self, other):
+        """Matrix product, through NumPy if it's available"""
+
+        if self.cols != other.rows:
+            raise ValueError("shapes don't fit for multiplication")
+
+        if not isinstance(other, Matrix):
+            return other.rmultiply(self)
+
+        if numpy is not None:
+            return Matrix.from_numpy(
+                numpy.matmul(self.as_numpy(), other.as_numpy()))
+
+        data = array("d")
+        for row in multiply_transposed(self, other):
+            data.extend(row)
+
+        return Matrix(self.rows, other.cols, data)
+
+    def transpose_main(self):
+        """Transposition around main diagonal"""
+
+        return self._laid(self.cols, self.rows, self.offset,
+                          (self.strides[1], self.strides[0]))
+
+    def transpose_side(self):
+        """Transposition around side diagonal"""
+
+        last = self.offset + (self.rows - 1) * self.strides[0] \
+            + (self.cols - 1) * self.strides[1]
+        return self._laid(self.cols, self.rows, last,
+                          (-self.strides[1], -self.strides[0]))
+
+    def transpose_vertical(self):
+        """Transposition around vertical middle line"""
+
+        last_col = self.offset + (self.cols - 1) * self.strides[1]
+        return self._laid(self.rows, self.cols, last_col,
+                          (self.strides[0], -self.strides[1]))
+
+    def transpose_horizontal(self):
+        """Transposition around horizontal middle line"""
+
+        last_row = self.offset + (self.rows - 1) * self.strides[0]
+        return self._laid(self.rows, self.cols, last_row,
+                          (-self.strides[0], self.strides[1]))
+
+    def determinant(self, exact=False):
+        """Determinant through LU decomposition, NumPy's if available
+
+        Exact one of integer matrix is computed by Bareiss elimination
+        and returned as int.
+        """
+
+        if exact:
+            return bareiss_determinant(self.integer_rows())
+
+        if numpy is not None:
+            det = float(numpy.linalg.det(self.as_numpy()))
+            return round_if_integer(self.cells(), det)
+
+        return lu_determinant(self.to_rows())
+
+    def inverse(self, tolerance=singular_tolerance, exact=False):
+        """Inverse matrix, None for singular one
+
+        Exact inverse of integer matrix is singular only for zero
+        determinant, its elements are then rounded to floats once.
+        """
+
+        if exact:
+            inverse = rational_inverse(self.integer_rows())
+        elif numpy is not None:
+            inverse = gauss_jordan_inverse_numpy(self.as_numpy(), tolerance)
+            return None if inverse is None else Matrix.from_numpy(inverse)
+        else:
+            inverse = gauss_jordan_inverse(self.to_rows(), tolerance)
+
+        return None if inverse is None else Matrix.from_rows(
+            [[float(cell) for cell in row] for row in inverse])
+
+    def integer_rows(self):
+        """Elements as list of lists of ints, for exact arithmetic"""
+
+        if not self.is_integer():
+            raise ValueError("exact arithmetic needs integer elements")
+
+        return [[int(cell) for cell in row] for row in self]
+
+    def _laid(self, rows, cols, offset, strides):
+        """View of the same data with elements laid out in given way"""
+
+        return Matrix(rows, cols, self.data, offset, strides)
+
+    def __eq__(self, other):
+        return isinstance(other, Matrix) and self.shape == other.shape \
+            and all(map(float.__eq__, self.cells(), other.cells()))
+
+    def __repr__(self):
+        return "Matrix.from_rows({})".format(self.to_rows())
+
+
+def gauss_jordan_inverse_numpy(matrix, tolerance=singular_tolerance):
+    """gauss_jordan_inverse over a NumPy array, None for singular matrix
+
+    Every pivot step is a single rank-one update of the augmented
+    array. numpy.linalg.inv doesn't expose its pivots, so elimination
+    is done here to judge singularity by the same relative tolerance.
+    """
+
+    size = len(matrix)
+    limit = numpy.abs(matrix).max(initial=0.0) * tolerance
+    rows = numpy.hstack((matrix, numpy.eye(size)))
+
+    for k in range(size):
+        pivot_idx = k + int(numpy.argmax(numpy.abs(rows[k:, k])))
+        if abs(rows[pivot_idx, k]) <= limit:
+            return None
+
+        if pivot_idx != k:
+            rows[[k, pivot_idx]] = rows[[pivot_idx, k]]
+        rows[k, k:] /= rows[k, k]
+        factors = rows[:, k].copy()
+        factors[k] = 0
+        rows[:, k:] -= numpy.outer(factors, rows[k, k:])
+
+    return rows[:, size:]
+
+
+def multiply_transposed(matrix1, matrix2):
+    """Matrix product as dot products of rows with second one's columns
+
+    Columns of the second matrix are built once, every result cell
+    is then a single pass over two sequences.
+    """
+
+    columns = list(zip(*matrix2))
+
+    return [[sum(map(mul, row, column)) for column in columns]
+            for row in matrix1]
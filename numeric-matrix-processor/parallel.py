@@ -0,0 +1,230 @@
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing.shared_memory import SharedMemory
+from operator import mul
+
+from decomposition import round_if_integer, singular_tolerance
+from matrix import Matrix, item_size
+
+
+# row blocks per worker, evens out blocks finishing at different times
+blocks_per_worker = 4
+
+
+def parallel_multiply(matrix1, matrix2, workers=None):
+    """Matrix product with row blocks computed by a pool of processes
+
+    Operands and the result live in shared memory, tasks carry only
+    its names and the rows to compute.
+    """
+
+    if matrix1.cols != matrix2.rows:
+        raise ValueError("shapes don't fit for multiplication")
+
+    rows, inner, cols = matrix1.rows, matrix1.cols, matrix2.cols
+    with shared(matrix1.flat()) as left, \
+            shared(matrix2.transpose_main().flat()) as right, \
+            shared(array("d", bytes(item_size * rows * cols))) as result:
+        tasks = [(left.name, right.name, result.name, inner, cols, start, end)
+                 for start, end in split_rows(0, rows, workers)]
+        with pool(workers, len(tasks)) as run:
+            list(run(_multiply_rows, tasks))
+
+        return Matrix(rows, cols, read_shared(result, rows * cols))
+
+
+def parallel_determinant(matrix, workers=None):
+    """Determinant by Gaussian elimination, rows below the pivot
+    are eliminated by a pool of processes at every step"""
+
+    size = matrix.rows
+    det = 1.0
+    with shared(matrix.flat()) as block, pool(workers, size) as run:
+        view = block.buf.cast("d")
+        try:
+            for k in range(size):
+                pivot_idx = max(range(k, size),
+                                key=lambda i: abs(view[i * size + k]))
+                pivot = view[pivot_idx * size + k]
+                if pivot == 0:
+                    return 0.0
+
+                if pivot_idx != k:
+                    swap_rows(view, size, k, pivot_idx)
+                    det = -det
+                det *= pivot
+                normalize_row(view, size, k, k)
+
+                tasks = [(block.name, size, k, start, end)
+                         for start, end in split_rows(k + 1, size, workers)]
+                list(run(_eliminate_rows, tasks))
+        finally:
+            view.release()
+
+    return round_if_integer(matrix.cells(), det)
+
+
+def parallel_inverse(matrix, tolerance=singular_tolerance, workers=None):
+    """Inverse by Gauss-Jordan elimination, None for singular matrix
+
+    Rows of the augmented matrix are eliminated by a pool of processes
+    at every pivot step, singularity is judged as gauss_jordan_inverse
+    does it.
+    """
+
+    size = matrix.rows
+    width = 2 * size
+    limit = max(map(abs, matrix.cells()), default=0.0) * tolerance
+
+    augmented = array("d")
+    for i, row in enumerate(matrix):
+        augmented.extend(row)
+        identity_row = array("d", bytes(item_size * size))
+        identity_row[i] = 1.0
+        augmented.extend(identity_row)
+
+    with shared(augmented) as block, pool(workers, size) as run:
+        view = block.buf.cast("d")
+        try:
+            for k in range(size):
+                pivot_idx = max(range(k, size),
+                                key=lambda i: abs(view[i * width + k]))
+                if abs(view[pivot_idx * width + k]) <= limit:
+                    return None
+
+                swap_rows(view, width, k, pivot_idx)
+                normalize_row(view, width, k, k)
+
+                tasks = [(block.name, width, k, start, end)
+                         for start, end in split_rows(0, size, workers)]
+                list(run(_eliminate_rows, tasks))
+
+            inverse = array("d")
+            for i in range(size):
+                inverse.extend(view[i * width + size:(i + 1) * width])
+        finally:
+            view.release()
+
+    return Matrix(size, size, inverse)
+
+
+def split_rows(start, end, workers=None):
+    """Split rows range into contiguous blocks, some for every worker"""
+
+    count = end - start
+    if count <= 0:
+        return []
+
+    workers = workers or os.cpu_count()
+    blocks = min(count, workers * blocks_per_worker) if workers > 1 else 1
+    step, extra = divmod(count, blocks)
+    bounds = []
+    for b in range(blocks):
+        block_end = start + step + (b < extra)
+        bounds.append((start, block_end))
+        start = block_end
+
+    return bounds
+
+
+@contextmanager
+def pool(workers, task_count):
+    """Map-like runner, a process pool or the current process
+    for a single worker"""
+
+    workers = workers or os.cpu_count()
+    if workers == 1 or task_count < 2:
+        yield lambda task, args: (task(*arg) for arg in args)
+        return
+
+    with ProcessPoolExecutor(min(workers, task_count)) as executor:
+        yield lambda task, args: executor.map(task, *zip(*args))
+
+
+@contextmanager
+def shared(data):
+    """Shared memory block with a copy of the array of doubles"""
+
+    block = SharedMemory(create=True, size=max(len(data) * item_size, 1))
+    try:
+        block.buf[:len(data) * item_size] = memoryview(data).cast("B")
+        yield block
+    finally:
+        block.close()
+        block.unlink()
+
+
+def read_shared(block, size):
+    """Copy of SIZE doubles from the shared memory block"""
+
+    data = array("d")
+    data.frombytes(block.buf[:size * item_size])
+
+    return data
+
+
+def swap_rows(view, width, i, j):
+    if i != j:
+        row_i = view[i * width:(i + 1) * width].tolist()
+        view[i * width:(i + 1) * width] = view[j * width:(j + 1) * width]
+        view[j * width:(j + 1) * width] = array("d", row_i)
+
+
+def normalize_row(view, width, i, k):
+    """Divide I row by its K element, cells left of it are zeros"""
+
+    start, end = i * width + k, (i + 1) * width
+    pivot = view[start]
+    view[start:end] = array("d", [cell / pivot
+                                  for cell in view[start:end].tolist()])
+
+
+@contextmanager
+def attached(name):
+    """Doubles view of shared memory block created by another process"""
+
+    block = SharedMemory(name=name)
+    view = block.buf.cast("d")
+    try:
+        yield view
+    finally:
+        view.release()
+        block.close()
+
+
+def _multiply_rows(left_name, right_name, result_name, inner, cols,
+                   start, end):
+    """Rows of the product, right operand is stored transposed
+
+    Columns are read straight from the shared block, so a task holds
+    Python floats of a single row only, whatever the operand size.
+    """
+
+    with attached(left_name) as left, attached(right_name) as right, \
+            attached(result_name) as result:
+        column_bounds = [(j * inner, (j + 1) * inner) for j in range(cols)]
+        for i in range(start, end):
+            row = left[i * inner:(i + 1) * inner].tolist()
+            result[i * cols:(i + 1) * cols] = array(
+                "d", [sum(map(mul, row, right[first:last]))
+                      for first, last in column_bounds])
+
+
+def _eliminate_rows(name, width, k, start, end):
+    """Subtract normalized K row from rows of the block, but itself,
+    to zero their K column"""
+
+    with attached(name) as view:
+        pivot_tail = view[k * width + k:(k + 1) * width].tolist()
+        for i in range(start, end):
+            if i == k:
+                continue
+
+            row_start, row_end = i * width + k, (i + 1) * width
+            factor = view[row_start]
+            if factor != 0:
+                view[row_start:row_end] = array("d", [
+                    a - factor * b for a, b
+                    in zip(view[row_start:row_end].tolist(), pivot_tail)])
@@ -1,3 +1,6 @@
+import sys
+
+import batch
 from general import your_choice
 from determinant import do_calc_determinant, do_inverse_matrix
 from simple import do_add_matrices, do_multiply_matrices, do_scale_matrix
@@ -37,6 +40,11 @@ def do_action(action_code):
 
 
 def main():
+    if len(sys.argv) > 1:
+        # operation and files given, no menu
+        batch.main()
+        return
+
     code = ""
     while code != "0":
         print(menu_text)
@@ -1,6 +1,5 @@
 from general import build_matrix, enter_size, enter_matrix, \
-    error, get_num_row, print_matrix, process_matrix
-
+    error, get_num_row, print_matrix
 
 enter_k = "Enter constant: "
 first = "first "
@@ -52,14 +51,8 @@ def do_multiply_matrices():
 def print_add_matrices(matrix1, matrix2):
     """Print matrix addition result or error"""
 
-    if len(matrix1) == len(matrix2) and len(matrix1[0]) == len(matrix2[0]):
-
-        result = process_matrix(
-            len(matrix1),
-            len(matrix1[0]),
-            lambda i, j: matrix1[i][j] + matrix2[i][j]
-        )
-        print_matrix(result)
+    if matrix1.shape == matrix2.shape:
+        print_matrix(matrix1.add(matrix2))
 
     else:
         print(error)
@@ -68,25 +61,14 @@ def print_add_matrices(matrix1, matrix2):
 def print_scale_matrix(matrix, scale):
     """Multiply matrix by given number"""
 
-    result = process_matrix(
-        len(matrix),
-        len(matrix[0]),
-        lambda i, j: matrix[i][j] * scale
-    )
-    print_matrix(result)
+    print_matrix(matrix.scale(scale))
 
 
 def print_multiply_matrices(matrix1, matrix2):
     """Multiply two matrices"""
 
-    if len(matrix1[0]) == len(matrix2):
-
-        result = process_matrix(
-            len(matrix1),
-            len(matrix2[0]),
-            lambda i, j: compute_mult_cell(i, j, matrix1, matrix2)
-        )
-        print_matrix(result)
+    if matrix1.cols == matrix2.rows:
+        print_matrix(matrix1.multiply(matrix2))
 
     else:
         print(error)
@@ -0,0 +1,256 @@
+from array import array
+from itertools import repeat
+from operator import mul
+
+from decomposition import is_integer_cells
+from matrix import Matrix, numpy
+
+
+# matrices with a smaller share of non-zero elements are kept sparse
+sparse_max_density = 0.05
+
+
+class SparseMatrix:
+    """Matrix in compressed sparse row (CSR) form
+
+    Non-zero values of row i with their column indices are
+    values[indptr[i]:indptr[i + 1]] and indices[indptr[i]:indptr[i + 1]],
+    columns ascending. Operations cost O(non-zeros), not O(rows * cols).
+    Operations with a dense Matrix operand give a dense Matrix.
+    """
+
+    __slots__ = ("rows", "cols", "indptr", "indices", "values")
+
+    def __init__(self, rows, cols, indptr, indices, values):
+        self.rows = rows
+        self.cols = cols
+        self.indptr = indptr
+        self.indices = indices
+        self.values = values
+
+    @classmethod
+    def from_coo(cls, rows, cols, entries):
+        """Matrix from (i, j, value) triples, duplicates are summed"""
+
+        row_cells = [{} for _ in range(rows)]
+        for i, j, value in entries:
+            if not (0 <= i < rows and 0 <= j < cols):
+                raise ValueError("cell ({}, {}) out of shape".format(i, j))
+            cells = row_cells[i]
+            cells[j] = cells.get(j, 0.0) + value
+
+        return cls.from_row_cells(rows, cols, row_cells)
+
+    @classmethod
+    def from_row_cells(cls, rows, cols, row_cells):
+        """Matrix from {column: value} dicts, one per row, zeros dropped"""
+
+        indptr = array("q", [0])
+        indices = array("q")
+        values = array("d")
+        for cells in row_cells:
+            for j in sorted(cells):
+                if cells[j] != 0:
+                    indices.append(j)
+                    values.append(cells[j])
+            indptr.append(len(indices))
+
+        return cls(rows, cols, indptr, indices, values)
+
+    @classmethod
+    def from_dense(cls, matrix):
+        """Matrix with non-zero elements of given dense one"""
+
+        indptr = array("q", [0])
+        indices = array("q")
+        values = array("d")
+        for row in matrix:
+            for j, value in enumerate(row):
+                if value != 0:
+                    indices.append(j)
+                    values.append(value)
+            indptr.append(len(indices))
+
+        return cls(matrix.rows, matrix.cols, indptr, indices, values)
+
+    @property
+    def shape(self):
+        return self.rows, self.cols
+
+    @property
+    def nnz(self):
+        """Number of stored non-zero elements"""
+
+        return len(self.values)
+
+    def is_square(self):
+        return self.rows == self.cols
+
+    def is_integer(self):
+        return is_integer_cells(self.values)
+
+    def row_items(self, i):
+        """(column, value) pairs of non-zero elements of I row"""
+
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return zip(self.indices[start:end], self.values[start:end])
+
+    def to_coo(self):
+        """Iterate (i, j, value) triples of non-zero elements"""
+
+        for i in range(self.rows):
+            for j, value in self.row_items(i):
+                yield i, j, value
+
+    def row(self, i):
+        """Dense copy of I row as an array"""
+
+        row = array("d", bytes(8 * self.cols))
+        for j, value in self.row_items(i):
+            row[j] = value
+
+        return row
+
+    def __iter__(self):
+        return (self.row(i) for i in range(self.rows))
+
+    def to_rows(self):
+        return [row.tolist() for row in self]
+
+    def to_dense(self):
+        data = array("d")
+        for row in self:
+            data.extend(row)
+
+        return Matrix(self.rows, self.cols, data)
+
+    def as_numpy(self):
+        return self.to_dense().as_numpy()
+
+    def add(self, other):
+        """Sum, sparse for sparse operand and dense for dense one"""
+
+        if self.shape != other.shape:
+            raise ValueError("shapes differ")
+
+        if isinstance(other, Matrix):
+            result = other.copy()
+            for i, j, value in self.to_coo():
+                result[i, j] += value
+            return result
+
+        row_cells = []
+        for i in range(self.rows):
+            cells = dict(self.row_items(i))
+            for j, value in other.row_items(i):
+                cells[j] = cells.get(j, 0.0) + value
+            row_cells.append(cells)
+
+        return SparseMatrix.from_row_cells(self.rows, self.cols, row_cells)
+
+    def scale(self, k):
+        """Matrix multiplied by a constant"""
+
+        if k == 0:
+            return SparseMatrix(self.rows, self.cols,
+                                array("q", bytes(8 * (self.rows + 1))),
+                                array("q"), array("d"))
+
+        return SparseMatrix(self.rows, self.cols, self.indptr, self.indices,
+                            array("d", map(mul, self.values, repeat(k))))
+
+    def multiply(self, other):
+        """Product visiting only non-zero elements of this matrix
+
+        Row i of the result sums rows k of other scaled by self[i, k].
+        """
+
+        if self.cols != other.rows:
+            raise ValueError("shapes don't fit for multiplication")
+
+        if isinstance(other, Matrix):
+            data = array("d")
+            other_rows = list(other)
+            for i in range(self.rows):
+                acc = [0.0] * other.cols
+                for k, a in self.row_items(i):
+                    acc = [c + a * b for c, b in zip(acc, other_rows[k])]
+                data.extend(acc)
+            return Matrix(self.rows, other.cols, data)
+
+        row_cells = []
+        for i in range(self.rows):
+            cells = {}
+            for k, a in self.row_items(i):
+                for j, b in other.row_items(k):
+                    cells[j] = cells.get(j, 0.0) + a * b
+            row_cells.append(cells)
+
+        return SparseMatrix.from_row_cells(self.rows, other.cols, row_cells)
+
+    def rmultiply(self, matrix):
+        """Product of dense matrix by this one, dense"""
+
+        if matrix.cols != self.rows:
+            raise ValueError("shapes don't fit for multiplication")
+
+        return self.transpose_main().multiply(matrix.transpose_main()) \
+            .transpose_main()
+
+    def transpose_main(self):
+        """Transposition around main diagonal, CSR of the transposed"""
+
+        return self._remapped(self.cols, self.rows, lambda i, j: (j, i))
+
+    def transpose_side(self):
+        """Transposition around side diagonal"""
+
+        return self._remapped(
+            self.cols, self.rows,
+            lambda i, j: (self.cols - 1 - j, self.rows - 1 - i))
+
+    def transpose_vertical(self):
+        """Transposition around vertical middle line"""
+
+        return self._remapped(self.rows, self.cols,
+                              lambda i, j: (i, self.cols - 1 - j))
+
+    def transpose_horizontal(self):
+        """Transposition around horizontal middle line"""
+
+        return self._remapped(self.rows, self.cols,
+                              lambda i, j: (self.rows - 1 - i, j))
+
+    def determinant(self, *args, **kwargs):
+        return self.to_dense().determinant(*args, **kwargs)
+
+    def inverse(self, *args, **kwargs):
+        return self.to_dense().inverse(*args, **kwargs)
+
+    def _remapped(self, rows, cols, position):
+        """Matrix with every element moved to position(i, j)"""
+
+        return SparseMatrix.from_coo(
+            rows, cols,
+            ((*position(i, j), value) for i, j, value in self.to_coo()))
+
+    def __repr__(self):
+        return "SparseMatrix.from_coo({}, {}, {})".format(
+            self.rows, self.cols, list(self.to_coo()))
+
+
+def compact(matrix):
+    """Sparse form of the matrix when it is mostly zeros"""
+
+    if isinstance(matrix, SparseMatrix):
+        return matrix
+
+    size = matrix.rows * matrix.cols
+    if numpy is not None:
+        non_zero = int(numpy.count_nonzero(matrix.as_numpy()))
+    else:
+        non_zero = size - sum(1 for cell in matrix.cells() if cell == 0)
+    if size and non_zero <= size * sparse_max_density:
+        return SparseMatrix.from_dense(matrix)
+
+    return matrix
@@ -0,0 +1,291 @@
+import io
+import random
+import unittest
+from fractions import Fraction
+
+from batch import read_text_matrix, write_text_matrix
+from decomposition import bareiss_determinant, gauss_jordan_inverse, \
+    lu_determinant, rational_inverse
+from determinant import calc_determinant_cofactor, get_minor
+from matrix import Matrix
+from parallel import parallel_determinant, parallel_inverse, \
+    parallel_multiply
+from sparse import SparseMatrix
+
+
+max_size = 5
+cases_per_size = 20
+places = 7
+
+
+def random_rows(rows, cols, integer=False, density=1.0):
+    """Random elements, integers in [-5, 5] or floats in [-10, 10)"""
+
+    def cell():
+        if random.random() >= density:
+            return 0.0
+        return float(random.randint(-5, 5)) if integer \
+            else random.uniform(-10, 10)
+
+    return [[cell() for _ in range(cols)] for _ in range(rows)]
+
+
+def square_cases():
+    """Random square matrices with singular and pivoting ones among them"""
+
+    random.seed(15)
+    for size in range(1, max_size + 1):
+        for _ in range(cases_per_size):
+            yield random_rows(size, size)
+            yield random_rows(size, size, integer=True)
+
+        if size > 1:
+            singular = random_rows(size, size, integer=True)
+            singular[-1] = list(singular[0])
+            yield singular
+
+            # zero in the corner, elimination has to swap rows
+            pivoting = random_rows(size, size, integer=True)
+            pivoting[0][0] = 0.0
+            yield pivoting
+
+
+def cofactor_inverse(rows):
+    """Inverse through cofactor expansion, None for zero determinant"""
+
+    det = calc_determinant_cofactor(rows)
+    if det == 0:
+        return None
+
+    size = len(rows)
+    if size == 1:
+        return [[1 / det]]
+
+    return [[(-1) ** (i + j)
+             * calc_determinant_cofactor(get_minor(j, i, rows)) / det
+             for j in range(size)] for i in range(size)]
+
+
+def transposed(rows):
+    return [list(col) for col in zip(*rows)]
+
+
+class DecompositionTest(unittest.TestCase):
+    """Elimination results agree with the cofactor reference"""
+
+    def assert_rows_equal(self, actual, expected):
+        self.assertEqual(len(actual), len(expected))
+        for actual_row, expected_row in zip(actual, expected):
+            self.assertEqual(len(actual_row), len(expected_row))
+            for a, b in zip(actual_row, expected_row):
+                self.assertAlmostEqual(a, b, places)
+
+    def test_lu_determinant(self):
+        for rows in square_cases():
+            with self.subTest(rows=rows):
+                self.assertAlmostEqual(lu_determinant(rows),
+                                       calc_determinant_cofactor(rows),
+                                       places - 3)
+
+    def test_integer_determinant_is_exact(self):
+        for rows in square_cases():
+            if not all(cell.is_integer() for row in rows for cell in row):
+                continue
+            with self.subTest(rows=rows):
+                expected = calc_determinant_cofactor(rows)
+                self.assertEqual(bareiss_determinant(rows), expected)
+                self.assertEqual(lu_determinant(rows), expected)
+                self.assertEqual(Matrix.from_rows(rows).determinant(),
+                                 expected)
+
+    def test_gauss_jordan_inverse(self):
+        for rows in square_cases():
+            with self.subTest(rows=rows):
+                expected = cofactor_inverse(rows)
+                for inverse in (gauss_jordan_inverse(rows),
+                                Matrix.from_rows(rows).inverse()):
+                    if expected is None:
+                        self.assertIsNone(inverse)
+                    else:
+                        if isinstance(inverse, Matrix):
+                            inverse = inverse.to_rows()
+                        self.assert_rows_equal(inverse, expected)
+
+    def test_rational_inverse(self):
+        for rows in square_cases():
+            if not all(cell.is_integer() for row in rows for cell in row):
+                continue
+            with self.subTest(rows=rows):
+                inverse = rational_inverse(rows)
+                if calc_determinant_cofactor(rows) == 0:
+                    self.assertIsNone(inverse)
+                    continue
+
+                size = len(rows)
+                identity = [[sum(Fraction(rows[i][k]) * inverse[k][j]
+                                 for k in range(size))
+                             for j in range(size)] for i in range(size)]
+                self.assertEqual(identity,
+                                 [[int(i == j) for j in range(size)]
+                                  for i in range(size)])
+
+    def test_tolerance_rejects_nearly_singular(self):
+        rows = [[1.0, 2.0], [1.0, 2.0 + 1e-15]]
+        self.assertIsNone(gauss_jordan_inverse(rows))
+        self.assertIsNone(Matrix.from_rows(rows).inverse())
+
+
+class ViewTest(unittest.TestCase):
+    """Transpositions share the data and read as their copies"""
+
+    def setUp(self):
+        random.seed(18)
+        self.rows = random_rows(3, 4)
+        self.matrix = Matrix.from_rows(self.rows)
+
+    def test_transpositions(self):
+        rows = self.rows
+        expected = {
+            "transpose_main": transposed(rows),
+            "transpose_side": transposed(rows[::-1])[::-1],
+            "transpose_vertical": [row[::-1] for row in rows],
+            "transpose_horizontal": rows[::-1],
+        }
+        for name, expected_rows in expected.items():
+            with self.subTest(name=name):
+                view = getattr(self.matrix, name)()
+                self.assertIs(view.data, self.matrix.data)
+                self.assertEqual(view.to_rows(), expected_rows)
+                self.assertEqual(list(view.cells()),
+                                 [cell for row in expected_rows
+                                  for cell in row])
+                self.assertEqual(view.copy(), view)
+
+    def test_view_of_view(self):
+        view = self.matrix.transpose_side().transpose_vertical() \
+            .transpose_main()
+        expected = transposed([row[::-1] for row in
+                               transposed(self.rows[::-1])[::-1]])
+        self.assertEqual(view.to_rows(), expected)
+
+    def test_view_writes_through(self):
+        view = self.matrix.transpose_main()
+        view[3, 2] = 42.0
+        self.assertEqual(self.matrix[2, 3], 42.0)
+
+    def test_operations_on_views(self):
+        view = self.matrix.transpose_side()
+        copy = view.copy()
+        self.assertEqual(view.add(view), copy.add(copy))
+        self.assertEqual(view.scale(2.5), copy.scale(2.5))
+        product = self.matrix.multiply(view)
+        self.assertEqual(product.to_rows(),
+                         self.matrix.multiply(copy).to_rows())
+
+
+class SparseTest(unittest.TestCase):
+    """Sparse and mixed operations agree with the dense ones"""
+
+    def setUp(self):
+        random.seed(21)
+
+    def assert_matrix_equal(self, actual, expected):
+        self.assertEqual(actual.shape, expected.shape)
+        for actual_row, expected_row in zip(actual.to_rows(),
+                                            expected.to_rows()):
+            for a, b in zip(actual_row, expected_row):
+                self.assertAlmostEqual(a, b, places)
+
+    def random_pair(self, rows, inner, cols):
+        left = Matrix.from_rows(random_rows(rows, inner, density=0.3))
+        right = Matrix.from_rows(random_rows(inner, cols, density=0.3))
+        return left, right
+
+    def test_multiply(self):
+        for _ in range(cases_per_size):
+            shape = [random.randint(1, max_size) for _ in range(3)]
+            left, right = self.random_pair(*shape)
+            expected = left.multiply(right)
+            sparse_left = SparseMatrix.from_dense(left)
+            sparse_right = SparseMatrix.from_dense(right)
+            with self.subTest(shape=shape):
+                product = sparse_left.multiply(sparse_right)
+                self.assertIsInstance(product, SparseMatrix)
+                self.assert_matrix_equal(product, expected)
+                for product in (sparse_left.multiply(right),
+                                left.multiply(sparse_right)):
+                    self.assertIsInstance(product, Matrix)
+                    self.assert_matrix_equal(product, expected)
+
+    def test_add(self):
+        for _ in range(cases_per_size):
+            rows, cols = random.randint(1, max_size), \
+                random.randint(1, max_size)
+            left, right = self.random_pair(rows, cols, rows)
+            right = right.transpose_main()
+            expected = left.add(right)
+            sparse_left = SparseMatrix.from_dense(left)
+            sparse_right = SparseMatrix.from_dense(right)
+            with self.subTest(shape=(rows, cols)):
+                self.assert_matrix_equal(sparse_left.add(sparse_right),
+                                         expected)
+                for total in (sparse_left.add(right),
+                              left.add(sparse_right)):
+                    self.assertIsInstance(total, Matrix)
+                    self.assert_matrix_equal(total, expected)
+
+    def test_scale_and_transpositions(self):
+        dense = Matrix.from_rows(random_rows(4, 3, density=0.3))
+        sparse = SparseMatrix.from_dense(dense)
+        self.assert_matrix_equal(sparse.scale(-1.5), dense.scale(-1.5))
+        self.assertEqual(sparse.scale(0).nnz, 0)
+        for name in ("transpose_main", "transpose_side",
+                     "transpose_vertical", "transpose_horizontal"):
+            with self.subTest(name=name):
+                self.assert_matrix_equal(getattr(sparse, name)(),
+                                         getattr(dense, name)())
+
+    def test_shape_mismatch(self):
+        sparse = SparseMatrix.from_dense(Matrix.from_rows([[1.0, 0.0]]))
+        with self.assertRaises(ValueError):
+            sparse.multiply(sparse)
+        with self.assertRaises(ValueError):
+            Matrix.from_rows([[1.0], [2.0]]).add(sparse)
+
+
+class ParallelTest(unittest.TestCase):
+    """Shared memory paths agree with the serial ones, in-process"""
+
+    def test_agree_with_serial(self):
+        random.seed(22)
+        left = Matrix.from_rows(random_rows(4, 3))
+        right = Matrix.from_rows(random_rows(3, 5))
+        square = Matrix.from_rows(random_rows(4, 4))
+        self.assertEqual(parallel_multiply(left, right, 1).to_rows(),
+                         Matrix.from_rows(
+                             [[sum(a * b for a, b in zip(row, col))
+                               for col in transposed(right.to_rows())]
+                              for row in left.to_rows()]).to_rows())
+        self.assertAlmostEqual(parallel_determinant(square, 1),
+                               square.determinant(), places)
+        for a, b in zip(parallel_inverse(square, workers=1).cells(),
+                        square.inverse().cells()):
+            self.assertAlmostEqual(a, b, places)
+
+
+class BatchTextTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        matrix = Matrix.from_rows([[1.5, -2.0], [0.1, 3.0]])
+        file = io.StringIO()
+        write_text_matrix(matrix.transpose_main(), file)
+        file.seek(0)
+        self.assertEqual(read_text_matrix(file), matrix.transpose_main())
+
+    def test_ragged_rows_rejected(self):
+        with self.assertRaises(ValueError):
+            read_text_matrix(io.StringIO("1 2\n3\n"))
+
+
+if __name__ == '__main__':
+    unittest.main()
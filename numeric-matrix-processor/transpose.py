@@ -1,5 +1,5 @@
 from general import build_matrix, enter_matrix, enter_size, \
-    error, print_matrix, process_matrix, your_choice
+    error, print_matrix, your_choice
 
 
 transpose_text = """
@@ -33,55 +33,15 @@ def print_transpose(matrix, t_code):
     result = []
 
     if t_code == "1":
-        result = transpose_main(matrix)
+        result = matrix.transpose_main()
 
     elif t_code == "2":
-        result = transpose_side(matrix)
+        result = matrix.transpose_side()
 
     elif t_code == "3":
-        result = transpose_vertical(matrix)
+        result = matrix.transpose_vertical()
 
     elif t_code == "4":
-        result = transpose_horizontal(matrix)
+        result = matrix.transpose_horizontal()
 
     print_matrix(result)
-
-
-def transpose_main(matrix):
-    """Transposition around main diagonal"""
-
-    return process_matrix(
-        len(matrix[0]),
-        len(matrix),
-        lambda i, j: matrix[j][i]
-    )
-
-
-def transpose_side(matrix):
-    """Transposition around side diagonal"""
-
-    return process_matrix(
-        len(matrix[0]),
-        len(matrix),
-        lambda i, j: matrix[-j - 1][-i - 1]
-    )
-
-
-def transpose_vertical(matrix):
-    """Transposition around vertical middle line"""
-
-    return process_matrix(
-        len(matrix),
-        len(matrix[0]),
-        lambda i, j: matrix[i][-j - 1]
-    )
-
-
-def transpose_horizontal(matrix):
-    """Transposition around horizontal middle line"""
-
-    return process_matrix(
-        len(matrix),
-        len(matrix[0]),
-        lambda i, j: matrix[-i - 1][j]
-    )
@@ -0,0 +1,579 @@
+from itertools import islice
+from mmap import mmap
+from threading import Lock
+from typing import AnyStr, Dict, Iterable, Iterator, List, NamedTuple, \
+    Optional, Sequence, Set, Tuple
+
+from cache import CacheInfo, LRUCache
+from compiler import ANY, BOL, CHAR, CLASS, EOL, JMP, MATCH, SPLIT, Program, \
+    compile_program, extract_literals
+from stats import MatchStats
+
+BACKTRACK = 'backtrack'
+DFA = 'dfa'
+# backtracking cost grows as 2 ** splits, keep it for trivial patterns only
+BACKTRACK_MAX_SPLITS = 3
+DFA_MAX_STATES = 10000
+DEFAULT_CACHE_SIZE = 256
+
+BINARY_TYPES = (bytes, bytearray, memoryview, mmap)
+
+Span = Tuple[int, int]
+
+
+class Pattern:
+    """Immutable compiled pattern, safe to share and reuse for many inputs.
+
+    Inputs may be str or bytes-like objects (bytes, bytearray, memoryview,
+    mmap), the latter are matched by a binary program compiled on demand.
+    """
+
+    __slots__ = ('_pattern', '_program', '_binary', '_bytes', '_anchored',
+                 '_prefix', '_required', '_engine', '_dfa', '_pike')
+
+    def __init__(self, pattern: str, program: Program, binary: bool = False):
+        self._pattern = pattern
+        self._program = program
+        self._binary = binary
+        self._bytes = self if binary else None
+        self._anchored = program[0][0] == BOL
+        self._prefix, self._required = extract_literals(program)
+        # backtracking pays per start position, unless the literal prefix
+        # or the anchor leaves only a few positions to try
+        few_starts = self._anchored or bool(self._prefix)
+        self._engine = BACKTRACK if few_starts and backtrack_safe(program) \
+            else DFA
+        closures = Closures(program)
+        self._dfa = LazyDFA(program, self._anchored, closures)
+        self._pike = PikeVM(program, self._anchored, closures)
+
+    @property
+    def pattern(self) -> str:
+        return self._pattern
+
+    @property
+    def program(self) -> Program:
+        return self._program
+
+    @property
+    def engine(self) -> str:
+        return self._engine
+
+    @property
+    def binary(self) -> bool:
+        return self._binary
+
+    @property
+    def prefix(self) -> AnyStr:
+        return self._prefix
+
+    @property
+    def required(self) -> Tuple[AnyStr, ...]:
+        return self._required
+
+    def as_bytes(self) -> 'Pattern':
+        """Same pattern compiled for bytes-like inputs"""
+
+        if self._bytes is None:
+            self._bytes = Pattern(self._pattern,
+                                  compile_program(self._pattern, True), True)
+        return self._bytes
+
+    def without_prefilter(self) -> 'Pattern':
+        """Same pattern running the engine over every input in full,
+        for measuring what the literal prefilter saves"""
+
+        pattern = Pattern(self._pattern, self._program, self._binary)
+        pattern._prefix = self._prefix[:0]
+        pattern._required = ()
+        return pattern
+
+    def match(self, src: Sequence,
+              stats: Optional[MatchStats] = None) -> bool:
+        """Check for a match, counting the work done into stats if given"""
+
+        if not self._binary and isinstance(src, BINARY_TYPES):
+            return self.as_bytes().match(src, stats)
+        if stats is not None:
+            stats.calls += 1
+        pos = self._skip(src, 0)
+        if pos == -1:
+            return False
+        if self._engine == DFA:
+            return self._dfa.search(src, pos, stats)
+        return self._backtrack_search(src, pos, stats=stats) is not None
+
+    def search(self, src: Sequence, pos: int = 0,
+               stats: Optional[MatchStats] = None) -> Optional[Span]:
+        """Leftmost match span starting from pos, None if there is none"""
+
+        if not self._binary and isinstance(src, BINARY_TYPES):
+            return self.as_bytes().search(src, pos, stats)
+        if stats is not None:
+            stats.calls += 1
+        return self._search(src, pos, stats=stats)
+
+    def finditer(self, src: Sequence,
+                 stats: Optional[MatchStats] = None) -> Iterator[Span]:
+        """Lazily yield spans of all non-overlapping matches"""
+
+        if not self._binary and isinstance(src, BINARY_TYPES):
+            yield from self.as_bytes().finditer(src, stats)
+            return
+        if stats is not None:
+            stats.calls += 1
+        limited = stats is not None and stats.limited
+        pos = 0
+        nonempty = False
+        while pos <= len(src):
+            span = self._search(src, pos, nonempty, stats)
+            if span is None:
+                return
+            if limited:
+                # every position may match, limits are checked per match
+                stats.check()
+            yield span
+            start, pos = span
+            # like re, an empty match may not repeat where the last one ended
+            nonempty = start == pos
+
+    def _search(self, src: Sequence, pos: int, nonempty: bool = False,
+                stats: Optional[MatchStats] = None) -> Optional[Span]:
+        """Leftmost match span, nonempty rejects empty one at pos"""
+
+        skipped = self._skip(src, pos)
+        if skipped == -1:
+            return None
+        nonempty = nonempty and skipped == pos
+        if self._engine == DFA:
+            return self._pike.search(src, skipped, nonempty, stats)
+        return self._backtrack_search(src, skipped, nonempty, stats)
+
+    def _skip(self, src: Sequence, pos: int) -> int:
+        """First position a match can start at, -1 if it can't occur"""
+
+        if isinstance(src, memoryview):
+            # no find() on views, callers scanning them prefilter the buffer
+            return pos
+        for literal in self._required:
+            if src.find(literal, pos) == -1:
+                return -1
+        if self._prefix:
+            return src.find(self._prefix, pos)
+        return pos
+
+    def _backtrack_search(self, src: Sequence, pos: int,
+                          nonempty: bool = False,
+                          stats: Optional[MatchStats] = None
+                          ) -> Optional[Span]:
+        last = 0 if self._anchored else len(src)
+        prefix = None if isinstance(src, memoryview) else self._prefix
+        start = pos
+        while start <= last:
+            end = backtrack(self._program, src, start,
+                            nonempty and start == pos, stats)
+            if stats is not None and stats.limited:
+                stats.check()
+            if end != -1:
+                return start, end
+            start += 1
+            if prefix:
+                start = src.find(prefix, start)
+                if start == -1:
+                    return None
+        return None
+
+    def match_many(self, srcs: Iterable[Sequence]) -> Iterator[bool]:
+        """Lazily match every given input, one result per input"""
+
+        return map(self.match, srcs)
+
+    def dense_table(self, alphabet: Sequence,
+                    max_states: Optional[int] = None
+                    ) -> Optional['DenseTable']:
+        """Complete DFA over the given chars for batch matching"""
+
+        return self._dfa.dense_table(alphabet, max_states)
+
+    def __getstate__(self):
+        return self._pattern, self._program, self._binary
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self._pattern!r})'
+
+
+def backtrack_safe(program: Program) -> bool:
+    """Check that backtracking can't go exponential or quadratic"""
+
+    splits = 0
+    for pc, (op, x, y) in enumerate(program):
+        if op in (JMP, SPLIT) and x <= pc:
+            return False
+        splits += op == SPLIT
+    return splits <= BACKTRACK_MAX_SPLITS
+
+
+def backtrack(program: Program, src: Sequence, start: int,
+              nonempty: bool = False,
+              stats: Optional[MatchStats] = None) -> int:
+    """Run program from given position, return end of the match or -1"""
+
+    end = len(src)
+    stack = [(0, start)]
+    steps = 0
+    branches = 0
+    depth = 1
+    try:
+        while stack:
+            pc, sp = stack.pop()
+            while True:
+                op, x, y = program[pc]
+                if op == CHAR:
+                    steps += 1
+                    if sp == end or src[sp] != x:
+                        break
+                    pc += 1
+                    sp += 1
+                elif op == ANY:
+                    steps += 1
+                    if sp == end:
+                        break
+                    pc += 1
+                    sp += 1
+                elif op == CLASS:
+                    steps += 1
+                    if sp == end or not x.matches(src[sp]):
+                        break
+                    pc += 1
+                    sp += 1
+                elif op == SPLIT:
+                    stack.append((y, sp))
+                    branches += 1
+                    if len(stack) > depth:
+                        depth = len(stack)
+                    pc = x
+                elif op == JMP:
+                    pc = x
+                elif op == BOL:
+                    if sp != 0:
+                        break
+                    pc += 1
+                elif op == EOL:
+                    if sp != end:
+                        break
+                    pc += 1
+                elif op == MATCH:
+                    if nonempty and sp == start:
+                        break
+                    return sp
+        return -1
+    finally:
+        if stats is not None:
+            stats.starts += 1
+            stats.chars += steps
+            stats.threads += branches
+            stats.depth(depth)
+
+
+class LazyDFA:
+    """Thompson NFA simulation caching visited state sets as DFA states.
+
+    Every input char costs one dict lookup once the state is cached,
+    so matching time is linear in the input length. Programs joining
+    several patterns are run from all given start instructions, their
+    MATCH instructions carry the pattern index.
+    """
+
+    def __init__(self, program: Program, anchored: bool, closures: 'Closures',
+                 starts: Tuple[int, ...] = (0,),
+                 max_states: int = DFA_MAX_STATES):
+        self._program = program
+        self._anchored = anchored
+        self._starts = starts
+        self._max_states = max_states
+        self._closure = closures.get
+        self._lock = Lock()
+        self._reset()
+
+    def search(self, src: Sequence, pos: int = 0,
+               stats: Optional[MatchStats] = None) -> bool:
+        states, transitions, matching = self._tables
+        if pos == 0:
+            state = self._initial
+        elif self._anchored:
+            return False
+        else:
+            state = self._resume
+        if matching[state]:
+            return True
+        if isinstance(src, mmap):
+            # mmap iterates over one byte long bytes, views give ints
+            src = memoryview(src)
+        chars = islice(src, pos, None)
+        if stats is not None:
+            stats.starts += 1
+            chars = stats.counted(chars)
+        for char in chars:
+            next_state = transitions[state].get(char)
+            if next_state is None:
+                if stats is not None:
+                    stats.transitions += 1
+                next_state, tables = self._add_transition(states[state], char)
+                states, transitions, matching = tables
+            state = next_state
+            if matching[state]:
+                return True
+            if state == self._dead:
+                return False
+        return bool(self._accepted_at_end(states[state], len(src) == 0))
+
+    def search_all(self, src: Sequence, expected: int) -> Set[object]:
+        """Values of all MATCH instructions reached at any position"""
+
+        states, transitions, matching = self._tables
+        state = self._initial
+        accepted = set(matching[state])
+        if isinstance(src, mmap):
+            src = memoryview(src)
+        for char in src:
+            next_state = transitions[state].get(char)
+            if next_state is None:
+                next_state, tables = self._add_transition(states[state], char)
+                states, transitions, matching = tables
+            state = next_state
+            if matching[state]:
+                accepted.update(matching[state])
+                if len(accepted) == expected:
+                    return accepted
+        accepted.update(self._accepted_at_end(states[state], len(src) == 0))
+        return accepted
+
+    def _reset(self):
+        self._ids: Dict[Tuple[int, ...], int] = {}
+        self._tables: Tuple[List[Tuple[int, ...]],
+                            List[Dict[object, int]],
+                            List[Tuple[object, ...]]] = [], [], []
+        self._restart = () if self._anchored \
+            else self._start_closure(False)
+        self._initial = self._intern(self._start_closure(True))
+        self._resume = self._intern(self._restart)
+        self._dead = self._intern(()) if self._anchored else -1
+
+    def _intern(self, pcs: Tuple[int, ...]) -> int:
+        state = self._ids.get(pcs)
+        if state is None:
+            states, transitions, matching = self._tables
+            state = len(states)
+            states.append(pcs)
+            transitions.append({})
+            matching.append(tuple(self._program[pc][1] for pc in pcs
+                                  if self._program[pc][0] == MATCH))
+            self._ids[pcs] = state
+        return state
+
+    def _add_transition(self, pcs: Tuple[int, ...], char) -> tuple:
+        with self._lock:
+            if len(self._ids) >= self._max_states:
+                self._reset()
+            next_state = self._intern(self._next_pcs(pcs, char))
+            self._tables[1][self._intern(pcs)][char] = next_state
+            return next_state, self._tables
+
+    def _next_pcs(self, pcs: Tuple[int, ...], char) -> Tuple[int, ...]:
+        next_pcs = set(self._restart)
+        for pc in pcs:
+            op, x, _ = self._program[pc]
+            if op == CHAR and x == char or op == ANY \
+                    or op == CLASS and x.matches(char):
+                next_pcs.update(self._closure(pc + 1, False, False))
+        return tuple(sorted(next_pcs))
+
+    def dense_table(self, alphabet: Sequence,
+                    max_states: Optional[int] = None
+                    ) -> Optional['DenseTable']:
+        """All states reachable from the start over the given chars.
+
+        Rows of the transition table are states, columns are indices
+        of the chars in alphabet. None if there are more than max_states
+        states, by default the limit of the lazy DFA.
+        """
+
+        max_states = max_states or self._max_states
+        ids: Dict[Tuple[int, ...], int] = {}
+        sets: List[Tuple[int, ...]] = []
+
+        def intern(pcs: Tuple[int, ...]) -> int:
+            if pcs not in ids:
+                ids[pcs] = len(sets)
+                sets.append(pcs)
+            return ids[pcs]
+
+        initial = intern(self._start_closure(True))
+        table = []
+        while len(table) < len(sets):
+            if len(sets) > max_states:
+                return None
+            pcs = sets[len(table)]
+            table.append([intern(self._next_pcs(pcs, char))
+                          for char in alphabet])
+        matching = [any(self._program[pc][0] == MATCH for pc in pcs)
+                    for pcs in sets]
+        at_end = [bool(self._accepted_at_end(pcs, False)) for pcs in sets]
+        return DenseTable(initial, table, matching, at_end)
+
+    def _start_closure(self, at_start: bool) -> Tuple[int, ...]:
+        if len(self._starts) == 1:
+            return self._closure(self._starts[0], at_start, False)
+        pcs = []
+        for start in self._starts:
+            pcs.extend(self._closure(start, at_start, False))
+        return tuple(sorted(set(pcs)))
+
+    def _accepted_at_end(self, pcs: Tuple[int, ...],
+                         at_start: bool) -> Set[object]:
+        accepted = set()
+        for pc in pcs:
+            if self._program[pc][0] == EOL:
+                for end_pc in self._closure(pc + 1, at_start, True):
+                    op, x, _ = self._program[end_pc]
+                    if op == MATCH:
+                        accepted.add(x)
+        return accepted
+
+
+class DenseTable(NamedTuple):
+    initial: int
+    transitions: List[List[int]]
+    matching: List[bool]
+    at_end: List[bool]
+
+
+class PikeVM:
+    """Thompson NFA simulation tracking match starts in priority order.
+
+    Finds the same leftmost match as backtracking would, in time linear
+    in the input length.
+    """
+
+    def __init__(self, program: Program, anchored: bool, closures: 'Closures'):
+        self._program = program
+        self._anchored = anchored
+        self._closure = closures.get
+
+    def search(self, src: Sequence, pos: int, nonempty: bool = False,
+               stats: Optional[MatchStats] = None) -> Optional[Span]:
+        program = self._program
+        closure = self._closure
+        end = len(src)
+        threads = []
+        seen = set()
+        matched = None
+        for sp in range(pos, end + 1):
+            if matched is None and (sp == 0 or not self._anchored):
+                # new thread has the lowest priority
+                if stats is not None:
+                    stats.starts += 1
+                for pc in closure(0, sp == 0, sp == end):
+                    if pc not in seen:
+                        seen.add(pc)
+                        threads.append((pc, sp))
+            if not threads:
+                break
+            if stats is not None:
+                self._count_step(stats, sp < end, threads)
+
+            char = src[sp] if sp < end else None
+            next_threads = []
+            seen = set()
+            for pc, start in threads:
+                op, x, _ = program[pc]
+                if op == MATCH:
+                    if nonempty and start == sp == pos:
+                        continue
+                    # threads after this one have lower priority
+                    matched = start, sp
+                    break
+                if sp < end and (op == CHAR and x == char or op == ANY
+                                 or op == CLASS and x.matches(char)):
+                    for next_pc in closure(pc + 1, False, sp + 1 == end):
+                        if next_pc not in seen:
+                            seen.add(next_pc)
+                            next_threads.append((next_pc, start))
+            threads = next_threads
+        return matched
+
+    @staticmethod
+    def _count_step(stats: MatchStats, examined: bool, threads: list):
+        stats.chars += examined
+        stats.threads += len(threads)
+        stats.depth(len(threads))
+        if stats.limited:
+            stats.check()
+
+
+class Closures:
+    """Cached instruction lists reachable without consuming input"""
+
+    def __init__(self, program: Program):
+        self._program = program
+        self._closures: Dict[Tuple[int, bool, bool], Tuple[int, ...]] = {}
+
+    def get(self, pc: int, at_start: bool, at_end: bool) -> Tuple[int, ...]:
+        """Instructions in priority order, BOL and EOL pass if satisfied"""
+
+        key = pc, at_start, at_end
+        closure = self._closures.get(key)
+        if closure is not None:
+            return closure
+
+        program = self._program
+        result = []
+        seen = set()
+        stack = [pc]
+        while stack:
+            pc = stack.pop()
+            if pc in seen:
+                continue
+            seen.add(pc)
+            op, x, y = program[pc]
+            if op == SPLIT:
+                stack.append(y)
+                stack.append(x)
+            elif op == JMP:
+                stack.append(x)
+            elif op == BOL and at_start or op == EOL and at_end:
+                stack.append(pc + 1)
+            elif op != BOL:
+                result.append(pc)
+        closure = tuple(result)
+        self._closures[key] = closure
+        return closure
+
+
+def compile(pattern: str) -> Pattern:
+    """Compiled pattern, shared with other callers of the same pattern"""
+
+    return pattern_cache.get(pattern, compile_uncached)
+
+
+def compile_uncached(pattern: str) -> Pattern:
+    return Pattern(pattern, compile_program(pattern))
+
+
+def set_cache_size(maxsize: int):
+    """Change compiled pattern cache capacity, 0 disables caching.
+
+    Raises ValueError for a negative size.
+    """
+
+    pattern_cache.resize(maxsize)
+
+
+def cache_info() -> CacheInfo:
+    return pattern_cache.info()
+
+
+pattern_cache = LRUCache(DEFAULT_CACHE_SIZE)
@@ -0,0 +1,145 @@
+import json
+import platform
+import sys
+from argparse import ArgumentParser, Namespace
+from timeit import Timer
+from typing import Callable, Dict, List, NamedTuple
+
+from automaton import compile, compile_uncached
+
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+DEFAULT_TOLERANCE = 0.25
+REPEAT = 3
+
+SHORT = 'the quick brown fox jumps over the lazy dog'
+LONG = (SHORT + ' ') * 2000
+LOG_LINE = '2020-12-06 12:00:00 INFO request served in 12ms'
+# long lines with a single one near the end both prefilter literals are in
+LOG_LINES = (LOG_LINE + ' ' + 'x' * 50 + '\n') * 10000 \
+    + '2020-12-06 12:00:01 ERROR upstream error, connection timeout\n' \
+    + LOG_LINE
+
+
+class Case(NamedTuple):
+    name: str
+    pattern: str
+    src: str
+    prefilter: bool = True
+
+
+CASES = [
+    Case('literal_short', 'lazy', SHORT),
+    Case('literal_long_miss', 'lazy cat', LONG),
+    Case('any_short', 'f.x', SHORT),
+    Case('anchored_start_hit', '^the', LONG),
+    Case('anchored_start_miss', '^dog', LONG),
+    Case('anchored_end_long', 'dog $', LONG),
+    Case('anchored_both', '^the.*dog$', SHORT),
+    Case('zero_or_one', 'colou?r', LOG_LINE),
+    Case('zero_or_more_short', 'qu*ick', SHORT),
+    Case('zero_or_more_long_miss', 'fox.*cat', LONG),
+    Case('one_or_more_long', 'z+y', LONG),
+    Case('escapes', r'12\.00\?', LOG_LINE * 50),
+    Case('no_literals_long', '.?.?x.?.?z', LONG),
+    Case('nested_quantifiers', 'a*a*a*a*a*a*a*a*b', 'a' * 5000 + 'cb'),
+    Case('optional_explosion', '^' + 'a?' * 20 + 'a' * 20 + '$', 'a' * 20),
+    Case('dot_star_chain', '.*.*.*=.*;', 'x' * 5000 + '=;='),
+    Case('class_digits_long', r'\d{2}:\d{2}ms', LOG_LINE * 50),
+    Case('alternation_long_miss', '(cat|cow|goat)s?', LONG),
+    Case('negated_class_long', '[^a-z ]+', LONG),
+    Case('prefilter_off_lines', 'error.*timeout', LOG_LINES, False),
+    Case('prefilter_on_lines', 'error.*timeout', LOG_LINES),
+]
+
+
+def measure(action: Callable[[], object]) -> float:
+    """Best time of one call in microseconds"""
+
+    timer = Timer(action)
+    number, _ = timer.autorange()
+    return min(timer.repeat(REPEAT, number)) / number * 1e6
+
+
+def run_cases(cases: List[Case]) -> Dict[str, float]:
+    timings = {}
+    for case in cases:
+        pattern = compile(case.pattern)
+        if not case.prefilter:
+            pattern = pattern.without_prefilter()
+        pattern.match(case.src)
+        timings[case.name] = measure(lambda: pattern.match(case.src))
+        timings[f'{case.name}.compile'] = measure(
+            lambda: compile_uncached(case.pattern))
+    return timings
+
+
+def compare(timings: Dict[str, float], baseline: Dict[str, float],
+            tolerance: float) -> List[str]:
+    """Names of cases slower than baseline by more than tolerance"""
+
+    return [name for name, time in timings.items()
+            if name in baseline and time > baseline[name] * (1 + tolerance)]
+
+
+def get_args() -> Namespace:
+    parser = ArgumentParser(description="""Measures pattern matching
+    performance and checks it against a stored baseline.""")
+    parser.add_argument('--output',
+                        help='file to write timings to, standard output '
+                             'if omitted')
+    parser.add_argument('--baseline',
+                        default=DEFAULT_BASELINE,
+                        help='baseline timings file')
+    parser.add_argument('--save-baseline',
+                        action='store_true',
+                        help='store the timings as the new baseline')
+    parser.add_argument('--tolerance',
+                        type=float,
+                        default=DEFAULT_TOLERANCE,
+                        help='allowed slowdown against the baseline, '
+                             'a fraction')
+    parser.add_argument('--filter',
+                        default='',
+                        help='run only cases with names containing it')
+    return parser.parse_args()
+
+
+def main():
+    args = get_args()
+    cases = [case for case in CASES if args.filter in case.name]
+    report = {
+        'python': platform.python_version(),
+        'unit': 'us',
+        'timings': run_cases(cases),
+    }
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(text)
+    else:
+        print(text)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as file:
+            file.write(text)
+        return
+
+    try:
+        with open(args.baseline) as file:
+            baseline = json.load(file)['timings']
+    except FileNotFoundError:
+        print(f'No baseline at {args.baseline}, nothing to compare',
+              file=sys.stderr)
+        return
+
+    slower = compare(report['timings'], baseline, args.tolerance)
+    for name in slower:
+        print(f'{name}: {report["timings"][name]:.2f}us, '
+              f'baseline {baseline[name]:.2f}us', file=sys.stderr)
+    if slower:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
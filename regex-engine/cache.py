@@ -0,0 +1,59 @@
+from collections import OrderedDict, namedtuple
+from threading import Lock
+from typing import Callable, Hashable
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class LRUCache:
+    """Bounded mapping evicting the least recently used entries"""
+
+    def __init__(self, maxsize: int):
+        self._data = OrderedDict()
+        self._lock = Lock()
+        self._maxsize = _checked_size(maxsize)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, factory: Callable[[Hashable], object]):
+        with self._lock:
+            if key in self._data:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return self._data[key]
+            self.misses += 1
+
+        # build outside of the lock, it may raise or take a while
+        value = factory(key)
+        with self._lock:
+            value = self._data.setdefault(key, value)
+            self._data.move_to_end(key)
+            self._evict()
+        return value
+
+    def resize(self, maxsize: int):
+        maxsize = _checked_size(maxsize)
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses,
+                             self._maxsize, len(self._data))
+
+    def _evict(self):
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+
+def _checked_size(maxsize: int) -> int:
+    if maxsize < 0:
+        raise ValueError(f'cache size must not be negative: {maxsize}')
+    return maxsize
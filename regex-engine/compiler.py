@@ -0,0 +1,185 @@
+from typing import AnyStr, List, Tuple
+
+from general import PatternError
+from syntax import MAX_CODE_POINT, Alternate, AnyChar, Class, Concat, \
+    Empty, End, Literal, Node, Repeat, Start, parse
+
+# opcodes of the compiled program, every instruction is (opcode, x, y)
+CHAR = 0
+ANY = 1
+SPLIT = 2
+JMP = 3
+BOL = 4
+EOL = 5
+MATCH = 6
+CLASS = 7
+CONSUMING = (CHAR, ANY, CLASS)
+
+MAX_ASCII = 0x7f
+
+Instruction = Tuple[int, object, int]
+Program = Tuple[Instruction, ...]
+
+
+class Compiler:
+    """Translates pattern syntax tree into a program for the engines.
+
+    Binary programs match bytes: literal chars become their UTF-8 bytes,
+    ANY and classes match a single byte.
+    """
+
+    def __init__(self, pattern: str, binary: bool = False):
+        self.__pattern = pattern
+        self.__binary = binary
+        self.__program: List[Instruction] = []
+
+    def compile(self) -> Program:
+        self.__emit(parse(self.__pattern))
+        self.__program.append((MATCH, None, 0))
+        return tuple(self.__program)
+
+    def __emit(self, node: Node):
+        program = self.__program
+        if isinstance(node, Literal):
+            if self.__binary:
+                program.extend((CHAR, byte, 0) for byte in node.char.encode())
+            else:
+                program.append((CHAR, node.char, 0))
+        elif isinstance(node, AnyChar):
+            program.append((ANY, None, 0))
+        elif isinstance(node, Class):
+            self.__check_binary_class(node)
+            program.append((CLASS, node.char_class, 0))
+        elif isinstance(node, Start):
+            program.append((BOL, None, 0))
+        elif isinstance(node, End):
+            program.append((EOL, None, 0))
+        elif isinstance(node, Concat):
+            for item in node.items:
+                self.__emit(item)
+        elif isinstance(node, Alternate):
+            self.__emit_alternation(node)
+        elif isinstance(node, Repeat):
+            self.__emit_repetition(node)
+        elif not isinstance(node, Empty):
+            raise TypeError(f'Unknown syntax node: {node!r}')
+
+    def __emit_alternation(self, node: Alternate):
+        program = self.__program
+        jumps = []
+        for option in node.options[:-1]:
+            split = len(program)
+            program.append(None)
+            self.__emit(option)
+            jumps.append(len(program))
+            program.append(None)
+            program[split] = (SPLIT, split + 1, len(program))
+        self.__emit(node.options[-1])
+        for jump in jumps:
+            program[jump] = (JMP, len(program), 0)
+
+    def __emit_repetition(self, node: Repeat):
+        for _ in range(node.min - 1 if node.max is None else node.min):
+            self.__emit(node.node)
+        if node.max is None:
+            if node.min == 0:
+                self.__emit_star(node.node)
+            else:
+                self.__emit_plus(node.node)
+            return
+
+        # x{m,n} is x{m} followed by n - m nested optional x
+        program = self.__program
+        splits = []
+        for _ in range(node.max - node.min):
+            splits.append(len(program))
+            program.append(None)
+            self.__emit(node.node)
+        for split in splits:
+            program[split] = (SPLIT, split + 1, len(program))
+
+    def __emit_star(self, node: Node):
+        program = self.__program
+        split = len(program)
+        program.append(None)
+        self.__emit(node)
+        program.append((JMP, split, 0))
+        program[split] = (SPLIT, split + 1, len(program))
+
+    def __emit_plus(self, node: Node):
+        program = self.__program
+        start = len(program)
+        self.__emit(node)
+        program.append((SPLIT, start, len(program) + 1))
+
+    def __check_binary_class(self, node: Class):
+        """Bytes can't match a part of non-ASCII chars, only all of them"""
+
+        if not self.__binary:
+            return
+        for lo, hi in node.char_class.ranges:
+            if hi > MAX_ASCII and not (lo <= MAX_ASCII + 1
+                                       and hi == MAX_CODE_POINT):
+                raise PatternError('non-ASCII class members are not '
+                                   'supported for bytes', self.__pattern, 0)
+
+
+def compile_program(pattern: str, binary: bool = False) -> Program:
+    return Compiler(pattern, binary).compile()
+
+
+def successors(program: Program, pc: int) -> Tuple[int, ...]:
+    op, x, y = program[pc]
+    if op == SPLIT:
+        return x, y
+    if op == JMP:
+        return x,
+    if op == MATCH:
+        return ()
+    return pc + 1,
+
+
+def reaches_match(program: Program, start: int, avoid: int,
+                  consuming: bool = True) -> bool:
+    """Check that MATCH is reachable from start without passing avoid"""
+
+    seen = {avoid}
+    stack = [start]
+    while stack:
+        pc = stack.pop()
+        if pc in seen:
+            continue
+        seen.add(pc)
+        op = program[pc][0]
+        if op == MATCH or not consuming and op in CONSUMING:
+            return True
+        stack.extend(successors(program, pc))
+    return False
+
+
+def extract_literals(program: Program) -> Tuple[AnyStr, Tuple[AnyStr, ...]]:
+    """Literal prefix of every match and substrings every match contains"""
+
+    runs = []
+    run_start = None
+    for pc, (op, x, _) in enumerate(program):
+        # CHAR always continues with the next instruction, so chars
+        # following a required one are consumed right after it
+        if op != CHAR:
+            if run_start is not None:
+                runs.append((run_start, pc))
+                run_start = None
+        elif run_start is None and not reaches_match(program, 0, pc):
+            run_start = pc
+
+    literals = tuple(join_chars([program[pc][1] for pc in range(start, end)])
+                     for start, end in runs)
+    prefix = literals[0][:0] if runs else ''
+    # nothing can be consumed before the first run, so matches start with it
+    if runs and not reaches_match(program, 0, runs[0][0], consuming=False):
+        prefix = literals[0]
+    return prefix, tuple(sorted(literals, key=len, reverse=True))
+
+
+def join_chars(chars: list) -> AnyStr:
+    return bytes(chars) if isinstance(chars[0], int) else ''.join(chars)
@@ -0,0 +1,32 @@
+EMPTY_STR = ''
+ANY_CHAR = '.'
+STARTS_CHAR = '^'
+ENDS_CHAR = '$'
+ZERO_OR_ONE = '?'
+ZERO_OR_MORE = '*'
+ONE_OR_MORE = '+'
+ESCAPE_CHAR = '\\'
+QUANTIFIERS = (ZERO_OR_ONE, ZERO_OR_MORE, ONE_OR_MORE)
+ALTERNATION = '|'
+GROUP_START = '('
+GROUP_END = ')'
+CLASS_START = '['
+CLASS_END = ']'
+CLASS_NEGATION = '^'
+CLASS_RANGE = '-'
+REPEAT_START = '{'
+REPEAT_END = '}'
+REPEAT_SEPARATOR = ','
+
+
+class PatternError(ValueError):
+    def __init__(self, message: str, pattern: str, pos: int):
+        self.pattern = pattern
+        self.pos = pos
+        super().__init__(f'{message} at position {pos}: {pattern!r}')
+
+
+class MatchTimeout(RuntimeError):
+    def __init__(self, message: str, stats):
+        self.stats = stats
+        super().__init__(f'{message}: {stats!r}')
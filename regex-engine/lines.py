@@ -0,0 +1,80 @@
+from contextlib import contextmanager
+from mmap import ACCESS_READ, mmap
+from typing import Iterator, Optional, Union
+
+from automaton import Pattern, Span
+
+NEWLINE = b'\n'
+
+Buffer = Union[bytes, bytearray, mmap]
+
+
+def iter_lines(buffer: Buffer, start: int = 0,
+               end: Optional[int] = None) -> Iterator[Span]:
+    """Offsets of buffer lines without line breaks, nothing is copied"""
+
+    end = len(buffer) if end is None else end
+    while start < end:
+        line_end = buffer.find(NEWLINE, start, end)
+        if line_end == -1:
+            line_end = end
+        yield start, line_end
+        start = line_end + 1
+
+
+def line_span(buffer: Buffer, pos: int,
+              start: int = 0, end: Optional[int] = None) -> Span:
+    """Offsets of the line containing given position"""
+
+    end = len(buffer) if end is None else end
+    line_start = buffer.rfind(NEWLINE, start, pos) + 1 or start
+    line_end = buffer.find(NEWLINE, pos, end)
+    return line_start, end if line_end == -1 else line_end
+
+
+def scan_lines(pattern: Pattern, buffer: Buffer, start: int = 0,
+               end: Optional[int] = None) -> Iterator[Span]:
+    """Offsets of lines matching the pattern.
+
+    Lines are matched through memoryview slices of the buffer, when the
+    pattern has required literals only lines containing the longest one
+    are visited at all.
+    """
+
+    pattern = pattern.as_bytes()
+    end = len(buffer) if end is None else end
+    literal = pattern.required[0] if pattern.required else None
+    with memoryview(buffer) as view:
+        if literal is None:
+            candidates = iter_lines(buffer, start, end)
+        else:
+            candidates = _lines_with(buffer, literal, start, end)
+        for line_start, line_end in candidates:
+            with view[line_start:line_end] as line:
+                matched = pattern.match(line)
+            if matched:
+                yield line_start, line_end
+
+
+def _lines_with(buffer: Buffer, literal: bytes,
+                start: int, end: int) -> Iterator[Span]:
+    pos = buffer.find(literal, start, end)
+    while pos != -1:
+        line_start, line_end = line_span(buffer, pos, start, end)
+        yield line_start, line_end
+        pos = buffer.find(literal, line_end + 1, end)
+
+
+@contextmanager
+def map_file(path: str) -> Iterator[Buffer]:
+    """Read-only memory map of the file, empty bytes for an empty file"""
+
+    with open(path, 'rb') as file:
+        try:
+            mapped = mmap(file.fileno(), 0, access=ACCESS_READ)
+        except ValueError:
+            # empty files can't be mapped
+            yield b''
+            return
+        with mapped:
+            yield mapped
@@ -0,0 +1,86 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Iterator, List, Optional, Tuple, Union
+
+from automaton import Pattern, Span, compile
+from lines import NEWLINE, Buffer, map_file, scan_lines
+
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+
+Chunk = Tuple[int, int]
+
+# pattern shipped once to every worker process by the pool initializer
+_worker_pattern: Optional[Pattern] = None
+
+
+def scan_file(pattern: Union[str, Pattern], path: str,
+              workers: Optional[int] = None,
+              chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Span]:
+    """Offsets of file lines matching the pattern, in file order.
+
+    The file is split into line-aligned chunks scanned by a pool
+    of worker processes, every chunk is memory mapped by the worker.
+    """
+
+    results = _run(pattern, path, workers, chunk_size, _scan_chunk)
+    return chain.from_iterable(results)
+
+
+def count_matches(pattern: Union[str, Pattern], path: str,
+                  workers: Optional[int] = None,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Number of file lines matching the pattern"""
+
+    return sum(_run(pattern, path, workers, chunk_size, _count_chunk))
+
+
+def split_chunks(buffer: Buffer, chunk_size: int) -> List[Chunk]:
+    """Split buffer into chunks of about given size ending at line breaks"""
+
+    chunks = []
+    start = 0
+    end = len(buffer)
+    while start < end:
+        boundary = buffer.find(NEWLINE, min(start + chunk_size, end) - 1)
+        chunk_end = end if boundary == -1 else boundary + 1
+        chunks.append((start, chunk_end))
+        start = chunk_end
+    return chunks
+
+
+def _run(pattern: Union[str, Pattern], path: str, workers: Optional[int],
+         chunk_size: int, task) -> Iterator:
+    if isinstance(pattern, str):
+        pattern = compile(pattern)
+    pattern = pattern.as_bytes()
+    with map_file(path) as buffer:
+        chunks = split_chunks(buffer, chunk_size)
+
+    workers = workers or os.cpu_count()
+    if workers == 1 or len(chunks) < 2:
+        yield from (task(path, chunk, pattern) for chunk in chunks)
+        return
+
+    with ProcessPoolExecutor(min(workers, len(chunks)),
+                             initializer=_init_worker,
+                             initargs=(pattern,)) as executor:
+        yield from executor.map(task, [path] * len(chunks), chunks)
+
+
+def _init_worker(pattern: Pattern):
+    global _worker_pattern
+    _worker_pattern = pattern
+
+
+def _scan_chunk(path: str, chunk: Chunk,
+                pattern: Optional[Pattern] = None) -> List[Span]:
+    with map_file(path) as buffer:
+        return list(scan_lines(pattern or _worker_pattern, buffer, *chunk))
+
+
+def _count_chunk(path: str, chunk: Chunk,
+                 pattern: Optional[Pattern] = None) -> int:
+    with map_file(path) as buffer:
+        matches = scan_lines(pattern or _worker_pattern, buffer, *chunk)
+        return sum(1 for _ in matches)
@@ -0,0 +1,163 @@
+from collections import deque
+from mmap import mmap
+from typing import AnyStr, Dict, FrozenSet, Iterable, Iterator, List, \
+    Sequence, Set, Tuple
+
+from automaton import BINARY_TYPES, Closures, LazyDFA, compile
+from cache import LRUCache
+from compiler import JMP, MATCH, SPLIT, Program
+
+# DFAs for the most recent sets of patterns passing the literal filter
+DFA_CACHE_SIZE = 64
+
+
+class PatternSet:
+    """Patterns matched together in a single pass over the input.
+
+    Required literals of all patterns are searched at once with
+    an Aho-Corasick automaton, then a DFA over the union of the programs
+    of the remaining patterns tells which of them match.
+    """
+
+    def __init__(self, patterns: Iterable[str], binary: bool = False):
+        self._compiled = [compile(pattern) for pattern in patterns]
+        self._binary = binary
+        self._bytes = self if binary else None
+        if binary:
+            self._compiled = [p.as_bytes() for p in self._compiled]
+
+        self._program, self._starts = join_programs(
+            [p.program for p in self._compiled])
+        self._closures = Closures(self._program)
+        self._dfas = LRUCache(DFA_CACHE_SIZE)
+
+        words: Dict[AnyStr, int] = {}
+        self._words: List[FrozenSet[int]] = []
+        for compiled in self._compiled:
+            self._words.append(frozenset(
+                words.setdefault(literal, len(words))
+                for literal in compiled.required))
+        self._literals = AhoCorasick(list(words))
+        self._unfiltered = tuple(
+            i for i, ids in enumerate(self._words) if not ids)
+
+    @property
+    def patterns(self) -> List[str]:
+        return [compiled.pattern for compiled in self._compiled]
+
+    def __len__(self):
+        return len(self._compiled)
+
+    def as_bytes(self) -> 'PatternSet':
+        """Same patterns compiled for bytes-like inputs"""
+
+        if self._bytes is None:
+            self._bytes = PatternSet(self.patterns, True)
+        return self._bytes
+
+    def match(self, src: Sequence) -> List[int]:
+        """Sorted indices of patterns matching the input"""
+
+        if not self._binary and isinstance(src, BINARY_TYPES):
+            return self.as_bytes().match(src)
+        candidates = self._candidates(src)
+        if not candidates:
+            return []
+        dfa = self._dfas.get(candidates, self._create_dfa)
+        return sorted(dfa.search_all(src, len(candidates)))
+
+    def match_many(self, srcs: Iterable[Sequence]) -> Iterator[List[int]]:
+        return map(self.match, srcs)
+
+    def _candidates(self, src: Sequence) -> Tuple[int, ...]:
+        """Patterns whose required literals all occur in the input"""
+
+        if len(self._unfiltered) == len(self._words):
+            return self._unfiltered
+        found = self._literals.find_all(src)
+        return tuple(i for i, ids in enumerate(self._words) if ids <= found)
+
+    def _create_dfa(self, candidates: Tuple[int, ...]) -> LazyDFA:
+        starts = tuple(self._starts[i] for i in candidates)
+        return LazyDFA(self._program, False, self._closures, starts)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.patterns!r})'
+
+
+def join_programs(programs: Sequence[Program]) -> Tuple[Program, List[int]]:
+    """Union program of the given ones, MATCH values are program indices"""
+
+    joined = []
+    starts = []
+    for index, program in enumerate(programs):
+        offset = len(joined)
+        starts.append(offset)
+        for op, x, y in program:
+            if op == SPLIT:
+                joined.append((op, x + offset, y + offset))
+            elif op == JMP:
+                joined.append((op, x + offset, y))
+            elif op == MATCH:
+                joined.append((op, index, y))
+            else:
+                joined.append((op, x, y))
+    return tuple(joined), starts
+
+
+class AhoCorasick:
+    """Automaton finding occurrences of many words in one pass"""
+
+    def __init__(self, words: Sequence[AnyStr]):
+        self._goto: List[Dict[object, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[FrozenSet[int]] = [frozenset()]
+        for index, word in enumerate(words):
+            self._add_word(word, index)
+        self._link_failures()
+
+    def find_all(self, src: Sequence) -> Set[int]:
+        """Indices of all words occurring in the input"""
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        found = set()
+        node = 0
+        if isinstance(src, mmap):
+            src = memoryview(src)
+        for char in src:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found.update(output[node])
+        return found
+
+    def _add_word(self, word: AnyStr, index: int):
+        node = 0
+        for char in word:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(frozenset())
+                self._goto[node][char] = next_node
+            node = next_node
+        self._output[node] |= {index}
+
+    def _link_failures(self):
+        """Breadth-first walk setting links to the longest proper suffix"""
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                suffix = self._goto[fallback].get(char, 0)
+                self._fail[child] = suffix if suffix != child else 0
+                self._output[child] |= self._output[self._fail[child]]
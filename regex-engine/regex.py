@@ -1,236 +1,201 @@
-from abc import ABC
-from enum import Enum
-from typing import List
-
-EMPTY_STR = ''
-ANY_CHAR = '.'
-STARTS_CHAR = '^'
-ENDS_CHAR = '$'
-ZERO_OR_ONE = '?'
-ZERO_OR_MORE = '*'
-ONE_OR_MORE = '+'
-ESCAPE_CHAR = '\\'
+import sys
+from argparse import ArgumentParser, Namespace
+from itertools import islice
+from typing import Iterable, Iterator, Optional, TextIO, Tuple
+
+from automaton import Pattern, Span, cache_info, compile, set_cache_size
+from general import CLASS_END, CLASS_NEGATION, CLASS_START, ESCAPE_CHAR, \
+    GROUP_END, GROUP_START, MatchTimeout, PatternError
+from lines import iter_lines, map_file, scan_lines
+from parallel import count_matches, scan_file
+from patternset import PatternSet
+from stats import MatchStats
+from vectorized import match_array
+
+__all__ = ['MatchStats', 'MatchTimeout', 'Matcher', 'Pattern', 'PatternError',
+           'PatternSet', 'cache_info', 'compile', 'count_matches',
+           'iter_lines', 'map_file', 'match_array', 'scan_file', 'scan_lines',
+           'set_cache_size']
+
+INPUT_SEPARATOR = '|'
+# number of results joined into one write call in batch mode
+WRITE_BATCH_SIZE = 4096
 
 
 class Matcher:
-    def __init__(self, pattern: str):
-        self.__filtered = pattern
-        self.__start = False
-        self.__end = False
-        self.__result = None
-        self.__prev_matched = False
-
-        self.__check_is_possible()
-        self.__process_bounds()
-        self.__post_process_pattern()
+    """Pattern matcher, with trace on it records the work of every call.
+
+    Counters of the latest call are in last_stats, stats sums up all
+    calls made so far. A call doing more than max_steps steps or running
+    longer than timeout seconds raises MatchTimeout.
+    """
+
+    def __init__(self, pattern: str, trace: bool = False,
+                 max_steps: Optional[int] = None,
+                 timeout: Optional[float] = None):
+        try:
+            self.__compiled = compile(pattern)
+        except PatternError:
+            # malformed pattern can't match anything
+            self.__compiled = None
+        self.__max_steps = max_steps
+        self.__timeout = timeout
+        self.__trace = trace or max_steps is not None or timeout is not None
+        self.stats = MatchStats() if trace else None
+        self.last_stats = None
 
     def match(self, src: str) -> bool:
-        if self.__filtered == src:
-            self.__result = True
-        if self.__has_result():
-            return self.__get_result()
-
-        for pos, char in enumerate(src):
-            self.__match_position(char, pos, src)
-            if self.__has_result():
-                return self.__get_result()
-
-        return False
-
-    def __match_position(self, char: str, pos: int, src: str):
-        src_last_idx = len(src) - 1
-        next_index = self.__index + 1
-        if not self.__check_escape() \
-                and self.__filtered_last >= next_index \
-                and self.__filtered[next_index] in (
-                ZERO_OR_ONE, ZERO_OR_MORE, ONE_OR_MORE):
-            self.__match_repetition(next_index, pos, src)
-        else:
-            self.__match(char, pos == src_last_idx)
-
-    def __check_escape(self) -> bool:
-        return self.__get_pattern_char() == ESCAPE_CHAR \
-               and (self.__index == 0
-                    or self.__filtered[self.__index - 1] != ESCAPE_CHAR)
-
-    def __match_repetition(self, next_index: int, pos: int, src: str) -> bool:
-        if self.__check_escape():
-            self.__index -= 1
-            next_index -= 1
-        tail_pattern = self.__filtered[next_index + 1:]
-        if self.__end:
-            if len(tail_pattern) == 0:
-                # empty tail pattern for non-empty tail with tail match on
-                return False
-            tail_pattern += ENDS_CHAR
-        checker = create_checker(self.__filtered[next_index],
-                                 self.__get_pattern_char(),
-                                 tail_pattern,
-                                 src,
-                                 pos)
-        check_result = checker.check()
-        while check_result == CheckResult.ONGOING:
-            check_result = checker.check()
-        self.__result = check_result == CheckResult.MATCHED
-
-    def __get_pattern_char(self) -> str:
-        return self.__filtered[self.__index]
-
-    def __has_result(self) -> bool:
-        return self.__result is not None
-
-    def __get_result(self) -> bool:
-        return self.__result
-
-    def __check_is_possible(self):
-        pattern = self.__filtered
-        wrong_start_char = any(x not in (-1, 0)
-                               for x in self.__find_unescaped(STARTS_CHAR))
-        wrong_end_char = any(x not in (-1, len(pattern) - 1)
-                             for x in self.__find_unescaped(ENDS_CHAR))
-        if wrong_start_char or wrong_end_char \
-                or pattern.startswith((ZERO_OR_ONE, ZERO_OR_MORE, ONE_OR_MORE)):
-            self.__result = False
-
-    def __find_unescaped(self, char: str) -> List[int]:
-        result = list()
-        pos = self.__add_unescaped_char(char, result, 0)
-        if pos > -1:
-            result.append(pos)
-        last = len(self.__filtered) - 2
-        while pos != -1 and pos < last:
-            pos = self.__add_unescaped_char(char, result, pos + 1)
-        return result
-
-    def __add_unescaped_char(self, char: str,
-                             result: List[int], start: int) -> int:
-        pos = self.__filtered.find(char, start)
-        if pos > 0 and self.__filtered[pos - 1] != ESCAPE_CHAR:
-            result.append(pos)
-        return pos
-
-    def __process_bounds(self):
-        if self.__filtered.startswith(STARTS_CHAR):
-            self.__filtered = self.__filtered[1:]
-            self.__start = True
-
-        if self.__filtered.endswith(ENDS_CHAR) \
-                and len(self.__filtered) > 1 \
-                and self.__filtered[-2] != ESCAPE_CHAR:
-            self.__filtered = self.__filtered[:-1]
-            self.__end = True
-
-    def __post_process_pattern(self):
-        self.__index = 0
-        self.__filtered_last = len(self.__filtered) - 1
-        if self.__filtered_last == -1 and not (self.__start and self.__end):
-            self.__result = True
-
-    def __match(self, char: str, consumed: bool):
-        if self.__check_finished():
-            return
-        if self.__check_escape():
-            self.__index += 1
-
-        pattern_char = self.__get_pattern_char()
-        matched = pattern_char in (ANY_CHAR, char)
-
-        self.__prev_matched = matched
-        self.__check_bounds(consumed)
-        if matched and not (self.__end and self.__pattern_consumed()):
-            self.__index += 1
+        if self.__compiled is None:
+            return False
+        if not self.__trace:
+            return self.__compiled.match(src)
+        stats = MatchStats(self.__max_steps, self.__timeout)
+        try:
+            return self.__compiled.match(src, stats)
+        finally:
+            self.__record(stats)
+
+    def match_many(self, srcs: Iterable[str]) -> Iterator[bool]:
+        if self.__compiled is None:
+            return (False for _ in srcs)
+        if self.__trace:
+            return map(self.match, srcs)
+        return self.__compiled.match_many(srcs)
+
+    def search(self, src: str, pos: int = 0) -> Optional[Span]:
+        if self.__compiled is None:
+            return None
+        if not self.__trace:
+            return self.__compiled.search(src, pos)
+        stats = MatchStats(self.__max_steps, self.__timeout)
+        try:
+            return self.__compiled.search(src, pos, stats)
+        finally:
+            self.__record(stats)
+
+    def finditer(self, src: str) -> Iterator[Span]:
+        if self.__compiled is None:
+            return iter(())
+        if not self.__trace:
+            return self.__compiled.finditer(src)
+        return self.__traced_finditer(src)
+
+    def __traced_finditer(self, src: str) -> Iterator[Span]:
+        stats = MatchStats(self.__max_steps, self.__timeout)
+        try:
+            yield from self.__compiled.finditer(src, stats)
+        finally:
+            self.__record(stats)
+
+    def __record(self, stats: MatchStats):
+        self.last_stats = stats
+        if self.stats is not None:
+            self.stats.update(stats)
+
+
+def split_input(line: str) -> Tuple[str, str]:
+    """Split at the first separator outside groups, classes and escapes"""
+
+    depth = 0
+    in_class = False
+    pos = 0
+    while pos < len(line):
+        char = line[pos]
+        if char == ESCAPE_CHAR:
+            pos += 1
+        elif in_class:
+            in_class = char != CLASS_END
+        elif char == CLASS_START:
+            in_class = True
+            if line.startswith(CLASS_NEGATION, pos + 1):
+                pos += 1
+            # a leading ] belongs to the class
+            if line.startswith(CLASS_END, pos + 1):
+                pos += 1
+        elif char == GROUP_START:
+            depth += 1
+        elif char == GROUP_END:
+            depth = max(depth - 1, 0)
+        elif char == INPUT_SEPARATOR and depth == 0:
+            return line[:pos], line[pos + 1:]
+        pos += 1
+    return line, ''
+
+
+def read_lines(file: TextIO) -> Iterator[str]:
+    return (line.rstrip('\r\n') for line in file)
+
+
+def match_pairs(lines: Iterable[str],
+                stats: Optional[MatchStats] = None) -> Iterator[bool]:
+    for line in lines:
+        pattern, string = split_input(line)
+        matcher = Matcher(pattern, stats is not None)
+        yield matcher.match(string)
+        if stats is not None and matcher.last_stats is not None:
+            stats.update(matcher.last_stats)
+
+
+def write_results(results: Iterable[bool], out: TextIO):
+    results = iter(results)
+    batch = list(islice(results, WRITE_BATCH_SIZE))
+    while batch:
+        out.write('\n'.join(map(str, batch)))
+        out.write('\n')
+        batch = list(islice(results, WRITE_BATCH_SIZE))
+    out.flush()
+
+
+def get_args() -> Namespace:
+    parser = ArgumentParser(description="""Matches strings against
+    a pattern. Without arguments reads a single 'pattern|string' line,
+    alternation in such a pattern has to be inside a group: '(a|b)|a'.""")
+    parser.add_argument('file',
+                        nargs='?',
+                        help='file with one input per line, '
+                             'standard input if omitted')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--pattern',
+                      help='match every line against this pattern')
+    mode.add_argument('--pairs',
+                      action='store_true',
+                      help="every line is a 'pattern|string' pair")
+    parser.add_argument('--stats',
+                        action='store_true',
+                        help='print the matching work counters to '
+                             'standard error')
+    args = parser.parse_args()
+    if args.file and args.pattern is None and not args.pairs:
+        parser.error('either --pattern or --pairs is required for a file')
+    return args
+
+
+def run_batch(args: Namespace):
+    file = open(args.file) if args.file else sys.stdin
+    try:
+        lines = read_lines(file)
+        stats = MatchStats() if args.stats else None
+        if args.pairs:
+            results = match_pairs(lines, stats)
         else:
-            self.__index = 0
-
-    def __pattern_consumed(self) -> bool:
-        return self.__index == self.__filtered_last
-
-    def __check_finished(self) -> bool:
-        return self.__index > self.__filtered_last
-
-    def __check_bounds(self, src_consumed: bool):
-        if self.__start and not self.__prev_matched:
-            self.__result = False
-
-        elif self.__pattern_consumed() and not self.__end:
-            if src_consumed:
-                self.__result = self.__prev_matched
-            elif self.__prev_matched:
-                self.__result = True
-
-        elif self.__end and src_consumed:
-            self.__result = self.__prev_matched
-
-
-class CheckResult(Enum):
-    ONGOING = 0
-    MATCHED = 1
-    FAILED = 2
-
-
-class RepeatingChecker(ABC):
-    def __init__(self, tail_pattern: str, char: str, src: str, pos: int):
-        self._tail_matcher = Matcher(STARTS_CHAR + tail_pattern)
-        self._char = char
-        self._src = src
-        self._pos = pos
-        self._iteration = 0
-
-    def check(self) -> CheckResult:
-        if self._cant_continue():
-            return CheckResult.FAILED
-        current_pos = self._pos + self._iteration
-        tail_matched = self._tail_matcher.match(self._src[current_pos:])
-        if self._iteration == 0:
-            self._iteration += 1
-            return CheckResult.MATCHED if tail_matched else CheckResult.ONGOING
-        pos_matched = self._pos_matched(current_pos - 1)
-        self._iteration += 1
-        if pos_matched and tail_matched:
-            return CheckResult.MATCHED
-        if pos_matched and not tail_matched:
-            return CheckResult.ONGOING
-        return CheckResult.FAILED
-
-    def _pos_matched(self, current_pos: int) -> bool:
-        return self._char in (ANY_CHAR, self._src[current_pos])
-
-    def _cant_continue(self) -> bool:
-        return self._pos + self._iteration >= len(self._src)
-
-
-class ZeroOrOne(RepeatingChecker):
-    def _cant_continue(self) -> bool:
-        return self._iteration > 1 or super()._cant_continue()
-
-
-class ZeroOrMore(RepeatingChecker):
-    pass
-
-
-class OneOrMore(RepeatingChecker):
-    def check(self) -> CheckResult:
-        if self._iteration == 0:
-            self._iteration += 1
-            if self._pos_matched(self._pos):
-                return CheckResult.ONGOING
-            return CheckResult.FAILED
-        return super().check()
-
-
-def create_checker(checker_type: str, pattern_char: str,
-                   tail_pattern: str, src: str, pos: int) -> RepeatingChecker:
-    if checker_type == ZERO_OR_ONE:
-        return ZeroOrOne(tail_pattern, pattern_char, src, pos)
-    if checker_type == ZERO_OR_MORE:
-        return ZeroOrMore(tail_pattern, pattern_char, src, pos)
-    if checker_type == ONE_OR_MORE:
-        return OneOrMore(tail_pattern, pattern_char, src, pos)
-    raise AttributeError(f'Unknown checker type: {checker_type}')
+            matcher = Matcher(args.pattern, args.stats)
+            stats = matcher.stats
+            results = matcher.match_many(lines)
+        write_results(results, sys.stdout)
+        if stats is not None:
+            print(stats, file=sys.stderr)
+    finally:
+        if file is not sys.stdin:
+            file.close()
 
 
 def main():
-    pattern, string = input().split('|')
+    args = get_args()
+    if args.pattern is not None or args.pairs:
+        run_batch(args)
+        return
+
+    pattern, string = split_input(input())
     result = Matcher(pattern).match(string)
     print(result)
 
@@ -0,0 +1,105 @@
+from threading import Lock
+from time import monotonic
+from typing import Dict, Iterable, Iterator, Optional
+
+from general import MatchTimeout
+
+COUNTERS = ('calls', 'chars', 'starts', 'threads', 'transitions',
+            'max_depth')
+# chars a DFA runs between two checks of the limits
+CHECK_INTERVAL = 1024
+
+
+class MatchStats:
+    """Work done by the engines while matching.
+
+    chars counts input chars examined, starts the positions a match was
+    attempted from, threads the alternative paths spawned (backtracking
+    branches or VM threads), transitions the DFA transitions computed
+    and max_depth the deepest backtracking stack or the most VM threads
+    alive at once.
+
+    With max_steps or timeout (seconds from now) given, the call raises
+    MatchTimeout once examined chars and spawned threads exceed the step
+    budget or the deadline passes.
+    """
+
+    __slots__ = COUNTERS + ('max_steps', 'deadline', '_next_check', '_lock')
+
+    def __init__(self, max_steps: Optional[int] = None,
+                 timeout: Optional[float] = None):
+        self._lock = Lock()
+        self.max_steps = max_steps
+        self.deadline = None if timeout is None else monotonic() + timeout
+        self.reset()
+
+    @property
+    def limited(self) -> bool:
+        return self.max_steps is not None or self.deadline is not None
+
+    @property
+    def steps(self) -> int:
+        return self.chars + self.threads
+
+    def reset(self):
+        for name in COUNTERS:
+            setattr(self, name, 0)
+        self._schedule()
+
+    def check(self):
+        """Raise MatchTimeout if the budget or the deadline is exceeded"""
+
+        if self.max_steps is not None and self.steps > self.max_steps:
+            raise MatchTimeout('step budget exceeded', self)
+        if self.deadline is not None and monotonic() > self.deadline:
+            raise MatchTimeout('deadline exceeded', self)
+
+    def update(self, other: 'MatchStats'):
+        """Add counters of other, keeping the larger max_depth"""
+
+        with self._lock:
+            self.calls += other.calls
+            self.chars += other.chars
+            self.starts += other.starts
+            self.threads += other.threads
+            self.transitions += other.transitions
+            self.max_depth = max(self.max_depth, other.max_depth)
+
+    def depth(self, depth: int):
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def counted(self, chars: Iterable) -> Iterator:
+        """Pass chars through, counting them and checking the limits"""
+
+        limited = self.limited
+        for char in chars:
+            self.chars += 1
+            if limited and self.chars >= self._next_check:
+                self.check()
+                self._schedule()
+            yield char
+
+    def _schedule(self):
+        """Set the char count to check the limits at next"""
+
+        self._next_check = self.chars + CHECK_INTERVAL
+        if self.max_steps is not None:
+            budget_end = self.max_steps - self.threads + 1
+            self._next_check = min(self._next_check, budget_end)
+
+    def as_dict(self) -> Dict[str, int]:
+        return {name: getattr(self, name) for name in COUNTERS}
+
+    def __getstate__(self):
+        return self.as_dict()
+
+    def __setstate__(self, state):
+        self.__init__()
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def __repr__(self):
+        counters = ', '.join(f'{name}={value}'
+                             for name, value in self.as_dict().items())
+        return f'{type(self).__name__}({counters})'
@@ -0,0 +1,317 @@
+from bisect import bisect_right
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+from general import ALTERNATION, ANY_CHAR, CLASS_END, CLASS_NEGATION, \
+    CLASS_RANGE, CLASS_START, ENDS_CHAR, ESCAPE_CHAR, GROUP_END, \
+    GROUP_START, ONE_OR_MORE, REPEAT_END, REPEAT_SEPARATOR, REPEAT_START, \
+    STARTS_CHAR, ZERO_OR_MORE, ZERO_OR_ONE, PatternError
+
+# bounded repetition is unrolled, so keep programs reasonably small
+MAX_REPEAT = 1000
+# code points below are kept in an int bitset, above in sorted ranges
+BITSET_SIZE = 256
+MAX_CODE_POINT = 0x10FFFF
+
+Range = Tuple[int, int]
+
+
+class CharClass:
+    """Set of chars given by ranges of code points"""
+
+    __slots__ = ('_bits', '_starts', '_ends', '_negated', '_ranges')
+
+    def __init__(self, ranges: List[Range], negated: bool = False):
+        self._ranges = merge_ranges(ranges)
+        self._negated = negated
+        self._bits = 0
+        starts = []
+        ends = []
+        for lo, hi in self._ranges:
+            for code in range(lo, min(hi, BITSET_SIZE - 1) + 1):
+                self._bits |= 1 << code
+            if hi >= BITSET_SIZE:
+                starts.append(max(lo, BITSET_SIZE))
+                ends.append(hi)
+        self._starts = tuple(starts)
+        self._ends = tuple(ends)
+
+    @property
+    def ranges(self) -> Tuple[Range, ...]:
+        return self._ranges
+
+    @property
+    def negated(self) -> bool:
+        return self._negated
+
+    def matches(self, char) -> bool:
+        """Check str char or byte value membership"""
+
+        code = char if isinstance(char, int) else ord(char)
+        if code < BITSET_SIZE:
+            return bool(self._bits >> code & 1) != self._negated
+        index = bisect_right(self._starts, code) - 1
+        found = index >= 0 and code <= self._ends[index]
+        return found != self._negated
+
+    def __getstate__(self):
+        return self._ranges, self._negated
+
+    def __setstate__(self, state):
+        self.__init__(list(state[0]), state[1])
+
+    def __repr__(self):
+        return f'{type(self).__name__}({list(self._ranges)!r}, ' \
+               f'negated={self._negated!r})'
+
+
+def merge_ranges(ranges: List[Range]) -> Tuple[Range, ...]:
+    merged = []
+    for lo, hi in sorted(ranges):
+        if merged and lo <= merged[-1][1] + 1:
+            merged[-1] = merged[-1][0], max(merged[-1][1], hi)
+        else:
+            merged.append((lo, hi))
+    return tuple(merged)
+
+
+DIGITS = [(ord('0'), ord('9'))]
+WORD_CHARS = [(ord('0'), ord('9')), (ord('A'), ord('Z')),
+              (ord('a'), ord('z')), (ord('_'), ord('_'))]
+SPACES = [(ord(' '), ord(' ')), (ord('\t'), ord('\r'))]
+CLASS_ESCAPES = {
+    'd': (DIGITS, False),
+    'D': (DIGITS, True),
+    'w': (WORD_CHARS, False),
+    'W': (WORD_CHARS, True),
+    's': (SPACES, False),
+    'S': (SPACES, True),
+}
+
+
+class Empty(NamedTuple):
+    pass
+
+
+class Literal(NamedTuple):
+    char: str
+
+
+class AnyChar(NamedTuple):
+    pass
+
+
+class Class(NamedTuple):
+    char_class: CharClass
+
+
+class Start(NamedTuple):
+    pass
+
+
+class End(NamedTuple):
+    pass
+
+
+class Concat(NamedTuple):
+    items: tuple
+
+
+class Alternate(NamedTuple):
+    options: tuple
+
+
+class Repeat(NamedTuple):
+    node: object
+    min: int
+    max: Optional[int]
+
+
+Node = Union[Empty, Literal, AnyChar, Class, Start, End,
+             Concat, Alternate, Repeat]
+
+
+class Parser:
+    """Recursive descent parser building a syntax tree of the pattern"""
+
+    def __init__(self, pattern: str):
+        self.__pattern = pattern
+        self.__pos = 0
+
+    def parse(self) -> Node:
+        node = self.__parse_alternation()
+        if self.__pos < len(self.__pattern):
+            # only an unbalanced group end stops the top level alternation
+            self.__error('unbalanced parenthesis')
+        return node
+
+    def __parse_alternation(self) -> Node:
+        options = [self.__parse_concat()]
+        while self.__peek() == ALTERNATION:
+            self.__pos += 1
+            options.append(self.__parse_concat())
+        return options[0] if len(options) == 1 else Alternate(tuple(options))
+
+    def __parse_concat(self) -> Node:
+        items = []
+        while self.__peek() not in (None, ALTERNATION, GROUP_END):
+            items.append(self.__parse_repeat())
+        if not items:
+            return Empty()
+        return items[0] if len(items) == 1 else Concat(tuple(items))
+
+    def __parse_repeat(self) -> Node:
+        anchor = self.__peek() in (STARTS_CHAR, ENDS_CHAR)
+        node = self.__parse_atom()
+        bounds = self.__parse_quantifier()
+        if bounds is None:
+            return node
+        if anchor:
+            # a bare anchor can't be repeated, a group holding one can
+            self.__error('nothing to repeat')
+        if self.__parse_quantifier() is not None:
+            self.__error('multiple repeat')
+        return Repeat(node, *bounds)
+
+    def __parse_quantifier(self) -> Optional[Tuple[int, Optional[int]]]:
+        char = self.__peek()
+        if char == ZERO_OR_ONE:
+            self.__pos += 1
+            return 0, 1
+        if char == ZERO_OR_MORE:
+            self.__pos += 1
+            return 0, None
+        if char == ONE_OR_MORE:
+            self.__pos += 1
+            return 1, None
+        if char == REPEAT_START:
+            return self.__parse_bounds()
+        return None
+
+    def __parse_bounds(self) -> Optional[Tuple[int, Optional[int]]]:
+        """Parse {m}, {m,} or {m,n}, any other brace is a literal"""
+
+        end = self.__pattern.find(REPEAT_END, self.__pos)
+        if end == -1:
+            return None
+        low, separator, high = \
+            self.__pattern[self.__pos + 1:end].partition(REPEAT_SEPARATOR)
+        if not low.isdigit() or high and not high.isdigit():
+            return None
+
+        bounds = int(low), int(high) if high else None
+        if not separator:
+            bounds = bounds[0], bounds[0]
+        if bounds[1] is not None and bounds[1] < bounds[0]:
+            self.__error('min repeat greater than max repeat')
+        if max(bounds[0], bounds[1] or 0) > MAX_REPEAT:
+            self.__error('repeat count too big')
+        self.__pos = end + 1
+        return bounds
+
+    def __parse_atom(self) -> Node:
+        char = self.__pattern[self.__pos]
+        if char in (ZERO_OR_ONE, ZERO_OR_MORE, ONE_OR_MORE):
+            self.__error('nothing to repeat')
+        if char == REPEAT_START and self.__parse_bounds() is not None:
+            self.__error('nothing to repeat')
+
+        self.__pos += 1
+        if char == GROUP_START:
+            node = self.__parse_alternation()
+            if self.__peek() != GROUP_END:
+                self.__error('missing ), unterminated subpattern')
+            self.__pos += 1
+            return node
+        if char == CLASS_START:
+            return Class(self.__parse_class())
+        if char == ESCAPE_CHAR:
+            return self.__parse_escape()
+        if char == ANY_CHAR:
+            return AnyChar()
+        if char == STARTS_CHAR:
+            return Start()
+        if char == ENDS_CHAR:
+            return End()
+        return Literal(char)
+
+    def __parse_escape(self) -> Node:
+        char = self.__peek()
+        if char is None:
+            self.__error('dangling escape')
+        self.__pos += 1
+        if char in CLASS_ESCAPES:
+            return Class(CharClass(*CLASS_ESCAPES[char]))
+        return Literal(char)
+
+    def __parse_class(self) -> CharClass:
+        start = self.__pos - 1
+        negated = self.__peek() == CLASS_NEGATION
+        if negated:
+            self.__pos += 1
+        ranges = []
+        first = True
+        while True:
+            char = self.__peek()
+            if char is None:
+                self.__pos = start
+                self.__error('unterminated character set')
+            if char == CLASS_END and not first:
+                self.__pos += 1
+                return CharClass(ranges, negated)
+            first = False
+            ranges.extend(self.__parse_class_item())
+
+    def __parse_class_item(self) -> List[Range]:
+        low = self.__parse_class_char()
+        if isinstance(low, list):
+            return low
+        if self.__peek() != CLASS_RANGE \
+                or self.__peek(1) in (None, CLASS_END):
+            return [(low, low)]
+
+        self.__pos += 1
+        high = self.__parse_class_char()
+        if isinstance(high, list) or high < low:
+            self.__error('bad character range')
+        return [(low, high)]
+
+    def __parse_class_char(self) -> Union[int, List[Range]]:
+        """Code point of the next char, ranges for class escapes"""
+
+        char = self.__pattern[self.__pos]
+        self.__pos += 1
+        if char != ESCAPE_CHAR:
+            return ord(char)
+        char = self.__peek()
+        if char is None:
+            self.__error('dangling escape')
+        self.__pos += 1
+        if char in CLASS_ESCAPES:
+            ranges, negated = CLASS_ESCAPES[char]
+            if negated:
+                return complement_ranges(ranges)
+            return list(ranges)
+        return ord(char)
+
+    def __peek(self, offset: int = 0) -> Optional[str]:
+        pos = self.__pos + offset
+        return self.__pattern[pos] if pos < len(self.__pattern) else None
+
+    def __error(self, message: str):
+        raise PatternError(message, self.__pattern, self.__pos)
+
+
+def complement_ranges(ranges: List[Range]) -> List[Range]:
+    result = []
+    low = 0
+    for lo, hi in merge_ranges(ranges):
+        if lo > low:
+            result.append((low, lo - 1))
+        low = hi + 1
+    if low <= MAX_CODE_POINT:
+        result.append((low, MAX_CODE_POINT))
+    return result
+
+
+def parse(pattern: str) -> Node:
+    return Parser(pattern).parse()
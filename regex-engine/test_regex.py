@@ -0,0 +1,135 @@
+import re
+import unittest
+from time import monotonic
+
+from automaton import BACKTRACK, DFA, DEFAULT_CACHE_SIZE, cache_info, \
+    compile, set_cache_size
+from general import MatchTimeout
+from regex import Matcher
+
+# generous bound, the linear engines take a fraction of it
+MAX_SECONDS = 2.0
+LONG_INPUT_SIZE = 20000
+
+SPAN_CASES = [
+    ('abc', 'xxabcxabc'),
+    ('colou?r', 'color colour colr'),
+    ('a+b', 'aab ab b aaab'),
+    ('^ab', 'abab'),
+    ('b$', 'abab'),
+    ('a.c', 'abc a c axxc'),
+    ('(ab|a)c', 'abc ac bc'),
+    ('x[0-9]+y', 'x1y x22y xy x3'),
+    ('[^ ]+', 'one two  three'),
+    ('a*', 'baaac'),
+]
+
+
+class PathologicalPatternTest(unittest.TestCase):
+    """Patterns exponential for backtracking finish in linear time"""
+
+    def assert_bounded(self, pattern: str, src: str, expected):
+        compiled = compile(pattern)
+        for name, action, result in (
+                ('match', lambda: compiled.match(src), expected is not None),
+                ('search', lambda: compiled.search(src), expected),
+                ('finditer', lambda: next(compiled.finditer(src), None),
+                 expected)):
+            with self.subTest(pattern=pattern, call=name):
+                started = monotonic()
+                self.assertEqual(action(), result)
+                self.assertLess(monotonic() - started, MAX_SECONDS)
+
+    def test_stacked_stars(self):
+        src = 'a' * LONG_INPUT_SIZE + 'cb'
+        self.assert_bounded('a*a*a*a*a*a*a*a*b', src,
+                            (LONG_INPUT_SIZE + 1, LONG_INPUT_SIZE + 2))
+
+    def test_nested_alternation_no_match(self):
+        # required 'b' is present, so the prefilter can't skip the run
+        src = 'a' * LONG_INPUT_SIZE + 'bc'
+        self.assert_bounded('(a|aa)*b$', src, None)
+
+    def test_nested_alternation_match(self):
+        src = 'a' * LONG_INPUT_SIZE + 'b'
+        self.assert_bounded('(a|aa)*b$', src, (0, LONG_INPUT_SIZE + 1))
+
+
+class EngineSelectionTest(unittest.TestCase):
+
+    def test_backtracking_for_few_starts(self):
+        for pattern in ('^abc', 'abc', 'colou?r', '^a.c$'):
+            with self.subTest(pattern=pattern):
+                self.assertEqual(compile(pattern).engine, BACKTRACK)
+
+    def test_dfa_for_loops_or_any_start(self):
+        for pattern in ('a*b', '(a|aa)*b$', 'x[0-9]+y', 'a*a*a*a*b',
+                        '^(a|b)*c'):
+            with self.subTest(pattern=pattern):
+                self.assertEqual(compile(pattern).engine, DFA)
+
+
+class SpanTest(unittest.TestCase):
+    """Spans agree with the re module"""
+
+    def test_search(self):
+        for pattern, src in SPAN_CASES:
+            with self.subTest(pattern=pattern, src=src):
+                expected = re.search(pattern, src)
+                self.assertEqual(compile(pattern).search(src),
+                                 expected and expected.span())
+
+    def test_search_from_position(self):
+        for pattern, src in SPAN_CASES:
+            with self.subTest(pattern=pattern, src=src):
+                expected = re.compile(pattern).search(src, 3)
+                self.assertEqual(compile(pattern).search(src, 3),
+                                 expected and expected.span())
+
+    def test_finditer(self):
+        for pattern, src in SPAN_CASES:
+            with self.subTest(pattern=pattern, src=src):
+                expected = [m.span() for m in re.finditer(pattern, src)]
+                self.assertEqual(list(compile(pattern).finditer(src)),
+                                 expected)
+
+
+class LimitsTest(unittest.TestCase):
+
+    def test_finditer_checks_limits_between_matches(self):
+        # backtracking pattern matching at every position never fails
+        # a start, the limits must still be checked after each match
+        src = 'a' * 1000000
+        for limits in ({'max_steps': 100}, {'timeout': 0.01}):
+            with self.subTest(**limits):
+                matcher = Matcher('ab?c?d?', **limits)
+                started = monotonic()
+                with self.assertRaises(MatchTimeout):
+                    sum(1 for _ in matcher.finditer(src))
+                self.assertLess(monotonic() - started, MAX_SECONDS)
+
+    def test_search_checks_limits_on_match(self):
+        matcher = Matcher('ab?c?d?', max_steps=1)
+        with self.assertRaises(MatchTimeout):
+            matcher.search('abcd')
+
+
+class CacheTest(unittest.TestCase):
+
+    def tearDown(self):
+        set_cache_size(DEFAULT_CACHE_SIZE)
+
+    def test_negative_size_rejected(self):
+        compile('abc')
+        with self.assertRaises(ValueError):
+            set_cache_size(-1)
+        self.assertEqual(cache_info().maxsize, DEFAULT_CACHE_SIZE)
+
+    def test_zero_size_disables_caching(self):
+        set_cache_size(0)
+        compile('abc')
+        self.assertEqual(cache_info().currsize, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+from typing import Iterable, NamedTuple, Optional, Union
+
+from automaton import Pattern, compile
+from cache import LRUCache
+
+# transition tables for the most recent pattern and alphabet pairs
+TABLE_CACHE_SIZE = 64
+# cells of a dense transition table, larger DFAs fall back to match()
+MAX_TABLE_SIZE = 1 << 22
+# highest code point mapped to a char index by a lookup array
+MAX_LOOKUP_CODE = 0xFFFF
+# columns between checks whether all rows of a block are decided
+DECIDED_CHECK_INTERVAL = 8
+# rows matched together, their chars should fit in the CPU cache
+BLOCK_ROWS = 1 << 14
+
+
+def _numpy():
+    """NumPy module, imported on first use, plain matching goes without"""
+
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('match_array requires numpy') from None
+    return numpy
+
+
+class Table(NamedTuple):
+    """Dense DFA as arrays indexed by state"""
+
+    initial: int
+    transitions: 'numpy.ndarray'
+    matching: 'numpy.ndarray'
+    at_end: 'numpy.ndarray'
+    # matching states and states that can't lead to a match any more
+    decided: 'numpy.ndarray'
+
+
+def match_array(pattern: Union[str, Pattern],
+                strings: Iterable) -> 'numpy.ndarray':
+    """Boolean mask of the strings matching the pattern.
+
+    Takes a fixed width str (U) or bytes (S) NumPy array, or anything
+    convertible to one. All strings advance through a dense DFA table
+    one column of chars at a time, with no per-string Python code.
+    """
+
+    numpy = _numpy()
+    if isinstance(pattern, str):
+        pattern = compile(pattern)
+    array = numpy.asarray(strings)
+    if array.dtype.kind not in 'US':
+        array = array.astype(str)
+    binary = array.dtype.kind == 'S'
+    if binary:
+        pattern = pattern.as_bytes()
+
+    flat = numpy.ascontiguousarray(array.reshape(-1))
+    width = array.dtype.itemsize // (1 if binary else 4)
+    if width == 0 or flat.size == 0:
+        empty = b'' if binary else ''
+        return numpy.full(array.shape, pattern.match(empty), dtype=bool)
+    codes = flat.view(numpy.uint8 if binary else numpy.uint32) \
+        .reshape(flat.size, width)
+    lengths = numpy.char.str_len(flat)
+
+    alphabet, char_index = index_chars(codes)
+    key = pattern.pattern, binary, alphabet.tobytes()
+    table = table_cache.get(key, lambda _: build_table(pattern, alphabet))
+    if table is None:
+        result = numpy.fromiter(map(pattern.match, flat.tolist()), bool,
+                                count=flat.size)
+    else:
+        result = run_table(table, codes, char_index, lengths)
+        result[lengths == 0] = pattern.match(b'' if binary else '')
+    return result.reshape(array.shape)
+
+
+def index_chars(codes: 'numpy.ndarray') -> tuple:
+    """Sorted distinct codes and a function mapping codes to their index"""
+
+    numpy = _numpy()
+    top = int(codes.max())
+    if top > MAX_LOOKUP_CODE:
+        alphabet = numpy.unique(codes)
+        return alphabet, lambda column: numpy.searchsorted(alphabet, column)
+    present = numpy.zeros(top + 1, dtype=bool)
+    present[codes.ravel()] = True
+    alphabet = numpy.flatnonzero(present)
+    lookup = numpy.zeros(top + 1, dtype=numpy.intp)
+    lookup[alphabet] = numpy.arange(len(alphabet))
+    return alphabet, lookup.take
+
+
+def build_table(pattern: Pattern,
+                alphabet: 'numpy.ndarray') -> Optional[Table]:
+    numpy = _numpy()
+    chars = alphabet.tolist()
+    if not pattern.binary:
+        chars = [chr(code) for code in chars]
+    dense = pattern.dense_table(chars, MAX_TABLE_SIZE // len(chars))
+    if dense is None:
+        return None
+    transitions = numpy.array(dense.transitions, dtype=numpy.intp)
+    matching = numpy.array(dense.matching, dtype=bool)
+    at_end = numpy.array(dense.at_end, dtype=bool)
+    states = numpy.arange(len(transitions))[:, None]
+    stuck = (transitions == states).all(axis=1) & ~at_end
+    decided = matching | stuck
+    # once the result is known the row stays in its state
+    transitions[decided] = states[decided]
+    return Table(dense.initial, transitions, matching, at_end, decided)
+
+
+def run_table(table: Table, codes: 'numpy.ndarray', char_index,
+              lengths: 'numpy.ndarray') -> 'numpy.ndarray':
+    """Run every row of codes through the table, column by column.
+
+    Rows go in blocks small enough for their columns to stay in cache,
+    chars past the end of a row map to a column keeping the state.
+    """
+
+    numpy = _numpy()
+    count, width = codes.shape
+    states_count, chars_count = table.transitions.shape
+    end_column = numpy.arange(states_count)[:, None]
+    # states are kept multiplied by the row width of the table
+    transitions = numpy.hstack((table.transitions, end_column)).ravel() \
+        * (chars_count + 1)
+    positions = numpy.arange(width)
+
+    result = numpy.empty(count, dtype=bool)
+    for start in range(0, count, BLOCK_ROWS):
+        block = slice(start, start + BLOCK_ROWS)
+        chars = char_index(codes[block])
+        chars[positions >= lengths[block, None]] = chars_count
+        states = numpy.full(len(chars), table.initial * (chars_count + 1),
+                            dtype=numpy.intp)
+        for column, column_chars in enumerate(chars.T.copy()):
+            states += column_chars
+            transitions.take(states, out=states, mode='clip')
+            if column % DECIDED_CHECK_INTERVAL == 0 and table.decided.take(
+                    states // (chars_count + 1)).all():
+                break
+        states //= chars_count + 1
+        result[block] = table.matching.take(states) \
+            | table.at_end.take(states)
+    return result
+
+
+table_cache = LRUCache(TABLE_CACHE_SIZE)
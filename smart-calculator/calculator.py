@@ -3,8 +3,7 @@ from typing import List
 from errors import AssignmentError, CheckedError, CommandError, IdentifierError
 from errors import expression_error, variable_error
 from general import variables
-from solver import Parser, Solver
-from tokenizer import Tokenizer
+from program import compile_expression
 
 # constants
 help_option = "/help"
@@ -97,11 +96,9 @@ def resolve_value(token: str) -> int:
 
 
 def process_expression(expression_str: str) -> None:
-    """Parse and evaluate an expression"""
+    """Evaluate an expression, compiled once for every distinct text"""
 
-    tokens = Tokenizer(expression_str).parse_tokens()
-    parsed = Parser(tokens).parse()
-    result = Solver(parsed).solve()
+    result = compile_expression(expression_str).evaluate(variables)
 
     print(result)
 
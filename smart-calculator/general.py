@@ -15,6 +15,28 @@ class Token:
         raise NotImplementedError
 
 
+class Variable:
+
+    def __init__(self, name: str):
+
+        self.name = name
+
+    def __repr__(self):
+
+        return self.name
+
+
+class Slot:
+
+    def __init__(self, index: int):
+
+        self.index = index
+
+    def __repr__(self):
+
+        return "${}".format(self.index)
+
+
 class Operator(metaclass=ABCMeta):
 
     @staticmethod
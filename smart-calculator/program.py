@@ -0,0 +1,58 @@
+from functools import lru_cache
+from typing import Dict, Sequence, Tuple
+from general import Slot, Variable
+from solver import Parser, Solver
+from tokenizer import Tokenizer
+
+# compiled expressions kept for re-evaluation
+program_cache_size = 256
+
+
+class Program:
+
+    def __init__(self, code: Sequence[object], names: Sequence[str]):
+
+        self._code = tuple(code)
+        self._names = tuple(names)
+
+    @property
+    def code(self) -> Tuple[object, ...]:
+        """Reverse polish notation with variables as slots"""
+
+        return self._code
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        """Variable name of every slot"""
+
+        return self._names
+
+    def evaluate(self, values: Dict[str, int]) -> int:
+        """Solve the program with slots filled from given variables"""
+
+        slots = [values[name] for name in self._names]
+
+        return Solver(self._code, slots).solve()
+
+    def __repr__(self):
+
+        return " ".join(map(repr, self._code))
+
+
+@lru_cache(maxsize=program_cache_size)
+def compile_expression(expression_str: str) -> Program:
+    """Tokenize and parse expression once, cached by its text"""
+
+    tokens = Tokenizer(expression_str).parse_tokens()
+    parsed = Parser(tokens).parse()
+
+    names = []
+    code = []
+    for token in parsed:
+        if isinstance(token, Variable):
+            if token.name not in names:
+                names.append(token.name)
+            token = Slot(names.index(token.name))
+        code.append(token)
+
+    return Program(code, names)
@@ -1,6 +1,6 @@
 from collections import deque
-from typing import List
-from general import Operator, UnaryOperator
+from typing import List, Sequence
+from general import Operator, Slot, UnaryOperator, Variable
 from errors import ExpressionError
 
 
@@ -29,7 +29,7 @@ class Parser:
     def _process_token(self, token: object) -> None:
         """Processes token using helper stack for operator reordering"""
 
-        if isinstance(token, int):
+        if isinstance(token, (int, Variable)):
             self._result.append(token)
         elif isinstance(token, Operator):
             self._process_operator(token)
@@ -83,9 +83,11 @@ class Parser:
 
 class Solver:
 
-    def __init__(self, expression: List[object]):
+    def __init__(self, expression: Sequence[object],
+                 slots: Sequence[int] = ()):
 
         self._expr = expression
+        self._slots = slots
         self._buffer = None
         self._result = None
 
@@ -97,6 +99,8 @@ class Solver:
         for token in self._expr:
             if isinstance(token, int):
                 self._buffer.append(token)
+            elif isinstance(token, Slot):
+                self._buffer.append(self._slots[token.index])
             elif isinstance(token, Operator):
                 self._perform_calculation(token)
 
@@ -2,7 +2,7 @@ from abc import ABCMeta
 from string import ascii_letters, digits
 from typing import List, Optional
 from errors import ExpressionError
-from general import Operator, UnaryOperator, operators, variables
+from general import Operator, UnaryOperator, Variable, operators, variables
 
 
 class Plus(UnaryOperator):
@@ -181,13 +181,14 @@ class VariableExtractor(OperandExtractor):
 
         return expression_str[pos] in ascii_letters
 
-    def extract(self) -> (int, int):
+    def extract(self) -> (Variable, int):
 
         name, pos = super().extract()
-        # variable name extracted - get value
-        value = variables[name]
+        # unknown variable is reported before any later syntax error,
+        # its value is read on evaluation
+        variables[name]
 
-        return value, pos
+        return Variable(name), pos
 
     def _extraction_finished(self, pos) -> bool:
 
@@ -436,6 +437,6 @@ class Tokenizer:
             self._validate_edge(index - 1, middle)
             return
 
-        if not isinstance(token, int):
+        if not isinstance(token, (int, Variable)):
             if index > middle or not isinstance(token, UnaryOperator):
                 raise ExpressionError